@@ -1,75 +1,961 @@
 from colorama import init, Fore, Style
 init(autoreset=True)
+import csv
+import heapq
+import importlib
+import itertools
 import json
 import os
-import matplotlib.pyplot as plt
+import numpy as np
+import sys
+import threading
 import time
-import yfinance as yf
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Stand-in for a heavy module that is only imported on first attribute access.
+# matplotlib and yfinance (which pulls in pandas) take over a second to import,
+# and plenty of sessions never plot or never touch the network.
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+plt = LazyModule("matplotlib.pyplot")
+mdates = LazyModule("matplotlib.dates")
+yf = LazyModule("yfinance")
 
 START_BALANCE = 10000.0
 DEFAULT_STOCKS = ["AAPL", "MSFT", "TSLA", "AMZN", "GOOG", "NVDA", "PLTR"]
 
+PRICE_TTL = 60  # seconds a quote is reused before refetching
+HISTORY_TTL = 15 * 60  # seconds a 2y history is reused before refetching
+PRICE_CACHE_SIZE = 512  # max tickers (quotes + histories) kept in memory
+FETCH_WORKERS = 8  # parallel per-ticker requests when a batched call can't be used
+FETCH_TIMEOUT = 10  # seconds before a single ticker request is given up on
+REFRESH_INTERVAL = 30  # seconds between background quote refreshes in main(); 0 disables
+PLOT_MAX_POINTS = 500  # longer series are thinned before plotting
+PLOT_DIR = None  # when set, charts are written here as PLOT_FORMAT files instead of opened
+PLOT_FORMAT = "png"
+WATCH_FPS = 10  # max watch-mode redraws per second
+WATCH_POLL_INTERVAL = 5  # seconds between quote polls for providers without a live feed
+WATCH_TICK_RATE = 2000  # ticks per second produced by the simulated feed
+JOURNAL_COMPACT_EVERY = 500  # journaled trades before they are folded into a fresh snapshot
+LOT_METHODS = ("average", "fifo", "lifo")  # how sells draw down the cost basis
+ORDER_TYPES = ("limit", "stop", "stop_limit")  # resting orders the OrderBook accepts
+PERFORMANCE_HORIZONS = {"1D": 2, "1W": 5, "1M": 22, "1Y": 252}  # label: trading days
+TRADING_DAYS = 252  # per year, for annualizing daily figures
+HISTORY_DIR = "history_cache"  # one OHLC file per ticker, kept between runs
+HISTORY_DAYS = 730  # calendar days of history handed to callers (~2y)
+
+# Fixed-width daily bar record; day is days since 1970-01-01
+HISTORY_DTYPE = np.dtype([
+    ("day", "<i4"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+# In-process LRU cache shared by every price lookup, so one screen refresh
+# fetches each ticker once instead of once per call site.
+class PriceCache:
+    def __init__(self, maxsize=PRICE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # key: (expires_at, value, stored_at)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    # Last known value even if expired; does not count as a hit or miss
+    def peek(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return None if entry is None else entry[1]
+
+    # Seconds since the value was stored, or None if there is none
+    def age(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return None if entry is None else time.monotonic() - entry[2]
+
+    def set(self, key, value, ttl):
+        now = time.monotonic()
+        with self.lock:
+            self.entries[key] = (now + ttl, value, now)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+price_cache = PriceCache()
+
+# Opt-in (--stats or FINANCE_GAME_STATS=1) call timings, network round-trip
+# counts and per-render totals for the hot paths. Disabled, it costs one
+# attribute check per decorated call.
+class SessionStats:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.calls = {}  # name: [count, total seconds]
+        self.network = {}  # request kind: count
+        self.renders = []  # (seconds, network calls, cache hits, cache misses)
+
+    def count(self, kind, n=1):
+        if self.enabled:
+            with self.lock:
+                self.network[kind] = self.network.get(kind, 0) + n
+
+    def timed(self, name):
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    with self.lock:
+                        entry = self.calls.setdefault(name, [0, 0.0])
+                        entry[0] += 1
+                        entry[1] += elapsed
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def render(self):
+        if not self.enabled:
+            yield
+            return
+        network = sum(self.network.values())
+        cache = price_cache.stats()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            after = price_cache.stats()
+            self.renders.append((
+                time.perf_counter() - start,
+                sum(self.network.values()) - network,
+                after["hits"] - cache["hits"],
+                after["misses"] - cache["misses"],
+            ))
+
+    def summary(self):
+        if not self.enabled:
+            return "Stats are off. Start the game with --stats (or FINANCE_GAME_STATS=1) to collect them."
+        lines = ["--- Session Stats ---"]
+        cache = price_cache.stats()
+        lines.append(f"Price cache: {cache['hits']} hits, {cache['misses']} misses, {cache['size']} entries")
+        network = ", ".join(f"{kind}: {count}" for kind, count in sorted(self.network.items())) or "none"
+        lines.append(f"Network requests: {sum(self.network.values())} ({network})")
+        if self.renders:
+            seconds = [r[0] for r in self.renders]
+            lines.append(f"Screen renders: {len(self.renders)} | avg {sum(seconds) / len(seconds) * 1000:.1f}ms | max {max(seconds) * 1000:.1f}ms")
+            last = self.renders[-1]
+            lines.append(f"  Last render: {last[0] * 1000:.1f}ms, {last[1]} requests, {last[2]} cache hits, {last[3]} misses")
+        for name, (count, total) in sorted(self.calls.items(), key=lambda item: -item[1][1]):
+            lines.append(f"  {name}: {count} calls, {total * 1000:.1f}ms total, {total / count * 1000:.2f}ms avg")
+        lines.append("---------------------")
+        return "\n".join(lines)
+
+stats = SessionStats(os.environ.get("FINANCE_GAME_STATS") == "1")
+
+_fetch_pool = None
+_fetch_pool_lock = threading.Lock()
+
+def configure_fetching(workers=None, timeout=None):
+    global FETCH_WORKERS, FETCH_TIMEOUT, _fetch_pool
+    with _fetch_pool_lock:
+        if workers is not None and workers != FETCH_WORKERS:
+            FETCH_WORKERS = workers
+            if _fetch_pool is not None:
+                _fetch_pool.shutdown(wait=False)
+                _fetch_pool = None
+        if timeout is not None:
+            FETCH_TIMEOUT = timeout
+
+def get_fetch_pool():
+    global _fetch_pool
+    with _fetch_pool_lock:
+        if _fetch_pool is None:
+            _fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch")
+        return _fetch_pool
+
+# Run fetch(ticker, timeout) for every ticker on the shared worker pool.
+# Returns (results, errors), both keyed by ticker; a ticker lands in exactly one of them.
+def fetch_many(fetch, tickers, timeout=None):
+    timeout = FETCH_TIMEOUT if timeout is None else timeout
+    tickers = list(dict.fromkeys(tickers))
+    results, errors = {}, {}
+    if not tickers:
+        return results, errors
+    pool = get_fetch_pool()
+    futures = {pool.submit(fetch, ticker, timeout): ticker for ticker in tickers}
+    # Requests time out individually; this bounds the wait if one hangs anyway.
+    rounds = -(-len(tickers) // FETCH_WORKERS)
+    done, pending = wait(futures, timeout=timeout * rounds + 1)
+    for future in done:
+        ticker = futures[future]
+        try:
+            results[ticker] = future.result()
+        except Exception as e:
+            errors[ticker] = e
+    for future in pending:
+        future.cancel()
+        errors[futures[future]] = TimeoutError(f"no response within {timeout}s")
+    return results, errors
+
+def _today():
+    return int(np.datetime64("today", "D").astype("i4"))
+
+def _frame_to_bars(hist):
+    index = hist.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    bars = np.empty(len(hist), dtype=HISTORY_DTYPE)
+    bars["day"] = index.values.astype("datetime64[D]").astype("i4")
+    for field, column in (("open", "Open"), ("high", "High"), ("low", "Low"), ("close", "Close"), ("volume", "Volume")):
+        bars[field] = hist[column].to_numpy(dtype="f8")
+    return bars
+
+# Daily bars per ticker as append-only binary files of HISTORY_DTYPE records.
+# A warm store only asks the network for bars from its last stored day onwards.
+class HistoryStore:
+    def __init__(self, directory=HISTORY_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+
+    def path(self, ticker):
+        return os.path.join(self.directory, f"{ticker.replace('/', '_')}.ohlc")
+
+    def read(self, ticker):
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=HISTORY_DTYPE)
+        count = os.path.getsize(path) // HISTORY_DTYPE.itemsize
+        return np.fromfile(path, dtype=HISTORY_DTYPE, count=count)
+
+    def write(self, ticker, bars, replace=False):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(ticker)
+        with self.lock:
+            if replace or not os.path.exists(path):
+                bars.tofile(path)
+                return
+            stored = self.read(ticker)
+            if len(stored):
+                bars = bars[bars["day"] >= stored["day"][-1]]
+            with open(path, "r+b") as f:
+                keep = len(stored)
+                # The last stored bar may have been a partial (intraday) one; overwrite it.
+                if len(bars) and keep and bars["day"][0] == stored["day"][-1]:
+                    keep -= 1
+                f.seek(keep * HISTORY_DTYPE.itemsize)
+                f.write(bars.tobytes())
+                f.truncate()
+
+    # The file is rewritten or touched on every check against the provider, so its
+    # mtime says when the series was last known complete. The last bar's day can't:
+    # on weekends and holidays it stays behind today however often we ask.
+    def is_current(self, ticker, stored):
+        if not len(stored):
+            return False
+        return time.time() - os.path.getmtime(self.path(ticker)) < HISTORY_TTL
+
+    def update(self, ticker, timeout=None):
+        stored = self.read(ticker)
+        if self.is_current(ticker, stored):
+            return stored
+        timeout = timeout or FETCH_TIMEOUT
+        if len(stored):
+            # The last stored bar may be a partial intraday one whose close has
+            # simply moved on, so anchor on the last completed bar instead.
+            anchor = stored[-2] if len(stored) > 1 else stored[-1]
+            stats.count("history")
+            bars = market_data.history(ticker, start=str(np.datetime64(int(anchor["day"]), "D")), timeout=timeout)
+            overlap = bars[bars["day"] == anchor["day"]]
+            # Closes are split/dividend adjusted; if the overlapping bar moved, the
+            # stored series is stale as a whole and has to be downloaded again.
+            if len(overlap) and anchor["day"] < _today() and not np.isclose(overlap["close"][0], anchor["close"], rtol=1e-3):
+                stats.count("history")
+                bars = market_data.history(ticker, period="2y", timeout=timeout)
+                self.write(ticker, bars, replace=True)
+                return bars
+            if len(bars):
+                self.write(ticker, bars)
+            else:
+                os.utime(self.path(ticker))
+            return self.read(ticker)
+        stats.count("history")
+        bars = market_data.history(ticker, period="2y", timeout=timeout)
+        if len(bars):
+            self.write(ticker, bars, replace=True)
+        return bars
+
+history_store = HistoryStore()
+
+def _period_days(period):
+    units = {"d": 1, "wk": 7, "mo": 31, "y": 366}
+    for unit, days in units.items():
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return int(period[:-len(unit)]) * days
+    raise ValueError(f"Unsupported period {period!r}")
+
+# Where quotes and daily bars come from. history() returns HISTORY_DTYPE bars,
+# oldest first, either the last `period` or everything from `start` on; quote()
+# returns the latest price or None if the ticker has none. Transport failures raise.
+class MarketDataProvider:
+    name = "base"
+    persist_history = False  # whether HistoryStore should keep a local copy
+
+    def history(self, ticker, period="2y", start=None, timeout=None):
+        raise NotImplementedError
+
+    def quote(self, ticker, timeout=None):
+        raise NotImplementedError
+
+    def quotes(self, tickers, timeout=None):
+        return {ticker: self.quote(ticker, timeout) for ticker in tickers}
+
+    # Live prices as batches of (ticker, price) ticks until stop is set. Without
+    # a push feed this polls quotes(); offline providers simulate ticks instead.
+    def stream(self, tickers, stop):
+        while not stop.is_set():
+            try:
+                quotes = self.quotes(tickers)
+            except Exception:
+                quotes = {}
+            yield [(ticker, price) for ticker, price in quotes.items() if price is not None]
+            stop.wait(WATCH_POLL_INTERVAL)
+
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+    persist_history = True
+
+    def history(self, ticker, period="2y", start=None, timeout=None):
+        stock = yf.Ticker(ticker)
+        timeout = timeout or FETCH_TIMEOUT
+        if start is not None:
+            return _frame_to_bars(stock.history(start=start, timeout=timeout))
+        return _frame_to_bars(stock.history(period=period, timeout=timeout))
+
+    def quote(self, ticker, timeout=None):
+        price = yf.Ticker(ticker).history(period="1d", timeout=timeout or FETCH_TIMEOUT)["Close"]
+        if price.empty:
+            return None
+        return float(price.iloc[-1])
+
+    # One batched download for the whole set
+    def quotes(self, tickers, timeout=None):
+        tickers = list(tickers)
+        data = yf.download(tickers, period="1d", progress=False, auto_adjust=True, threads=False, timeout=timeout or FETCH_TIMEOUT)
+        closes = data["Close"]
+        if closes.ndim == 1:
+            closes = closes.to_frame(tickers[0])
+        quotes = {}
+        for ticker in tickers:
+            column = closes[ticker].dropna() if ticker in closes else None
+            quotes[ticker] = None if column is None or column.empty else float(column.iloc[-1])
+        return quotes
+
+# Offline provider serving bars recorded in a HistoryStore directory (e.g. a copy
+# of history_cache/) after an optional simulated network delay per call.
+class ReplayProvider(MarketDataProvider):
+    name = "replay"
+
+    def __init__(self, directory=HISTORY_DIR, latency=0.0):
+        self.store = HistoryStore(directory)
+        self.latency = latency
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _bars(self, ticker):
+        return self.store.read(ticker)
+
+    def history(self, ticker, period="2y", start=None, timeout=None):
+        self._wait()
+        bars = self._bars(ticker)
+        if not len(bars):
+            return bars
+        if start is not None:
+            first = int(np.datetime64(start, "D").astype("i4"))
+        else:
+            first = int(bars["day"][-1]) - _period_days(period) + 1
+        return bars[np.searchsorted(bars["day"], first):]
+
+    def quote(self, ticker, timeout=None):
+        self._wait()
+        bars = self._bars(ticker)
+        return float(bars["close"][-1]) if len(bars) else None
+
+    def quotes(self, tickers, timeout=None):
+        self._wait()
+        quotes = {}
+        for ticker in tickers:
+            bars = self._bars(ticker)
+            quotes[ticker] = float(bars["close"][-1]) if len(bars) else None
+        return quotes
+
+    def stream(self, tickers, stop):
+        start = {ticker: price for ticker, price in self.quotes(tickers).items() if price is not None}
+        return simulated_ticks(start, stop)
+
+# Offline provider generating a deterministic random walk per ticker (same seed,
+# same prices), ending today. Useful for benchmarks and demos without a network.
+class SyntheticProvider(ReplayProvider):
+    name = "synthetic"
+
+    def __init__(self, seed=0, days=520, latency=0.0):
+        self.seed = seed
+        self.days = days
+        self.latency = latency
+        self.generated = {}
+        self.lock = threading.Lock()
+
+    def _bars(self, ticker):
+        with self.lock:
+            bars = self.generated.get(ticker)
+            if bars is None:
+                bars = self.generated[ticker] = self._generate(ticker)
+            return bars
+
+    def _generate(self, ticker):
+        import zlib
+        rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode())])
+        calendar = np.arange(_today() - self.days * 7 // 5 - 7, _today() + 1)
+        days = calendar[(calendar + 3) % 7 < 5][-self.days:]  # weekdays only; day 0 was a Thursday
+        closes = rng.uniform(10, 500) * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(days))))
+        opens = np.concatenate(([closes[0]], closes[:-1]))
+        spread = np.abs(rng.normal(0, 0.01, len(days)))
+        bars = np.empty(len(days), dtype=HISTORY_DTYPE)
+        bars["day"] = days
+        bars["open"] = opens
+        bars["close"] = closes
+        bars["high"] = np.maximum(opens, closes) * (1 + spread)
+        bars["low"] = np.minimum(opens, closes) * (1 - spread)
+        bars["volume"] = rng.integers(100_000, 10_000_000, len(days))
+        return bars
+
+# Random-walk tick feed starting from the given prices, paced at `rate` ticks per
+# second and delivered in small batches. Ticks are generated with array ops, and
+# each ticker's path stays continuous within and across batches.
+def simulated_ticks(start_prices, stop, rate=WATCH_TICK_RATE, volatility=0.0005, seed=None):
+    names = np.array(list(start_prices))
+    prices = np.array(list(start_prices.values()), dtype="f8")
+    if not len(names):
+        return
+    rng = np.random.default_rng(seed)
+    last = time.perf_counter()
+    while not stop.is_set():
+        stop.wait(0.01)
+        count = int((time.perf_counter() - last) * rate)
+        if not count:
+            continue
+        last += count / rate
+        which = rng.integers(0, len(names), count)
+        steps = rng.normal(0, volatility, count)
+        # Cumulative log-return per ticker: sort ticks by ticker, cumsum, and
+        # subtract each ticker's running total at the start of its group.
+        order = np.argsort(which, kind="stable")
+        grouped = which[order]
+        totals = np.cumsum(steps[order])
+        starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+        sizes = np.diff(np.r_[starts, count])
+        offsets = np.repeat(totals[starts] - steps[order][starts], sizes)
+        path = prices[grouped] * np.exp(totals - offsets)
+        ends = starts + sizes - 1
+        prices[grouped[ends]] = path[ends]
+        tick_prices = np.empty(count)
+        tick_prices[order] = path
+        yield list(zip(names[which].tolist(), tick_prices.tolist()))
+
+PROVIDERS = {"yfinance": YFinanceProvider, "replay": ReplayProvider, "synthetic": SyntheticProvider}
+
+market_data = YFinanceProvider()
+
+# Swap the data source for every price lookup; cached quotes from the old one are dropped
+def set_market_data(provider):
+    global market_data
+    market_data = provider
+    price_cache.clear()
+
+# Daily closes as two parallel NumPy arrays, oldest first.
+# Slicing with tail() returns views, so no data is copied.
+class PriceSeries:
+    __slots__ = ("dates", "closes")
+
+    def __init__(self, dates, closes):
+        self.dates = dates  # datetime64[D]
+        self.closes = closes  # float64
+
+    @staticmethod
+    def empty():
+        return PriceSeries(np.empty(0, dtype="datetime64[D]"), np.empty(0, dtype="f8"))
+
+    @staticmethod
+    def from_bars(bars):
+        return PriceSeries(bars["day"].astype("datetime64[D]"), np.ascontiguousarray(bars["close"]))
+
+    def __len__(self):
+        return len(self.closes)
+
+    def __bool__(self):
+        return len(self.closes) > 0
+
+    def __repr__(self):
+        if not self:
+            return "PriceSeries([])"
+        return f"PriceSeries({len(self)} days, {self.dates[0]}..{self.dates[-1]})"
+
+    @property
+    def latest(self):
+        return float(self.closes[-1])
+
+    def tail(self, days):
+        if days >= len(self):
+            return self
+        return PriceSeries(self.dates[-days:], self.closes[-days:])
+
+    # Close on the given day, or the last trading day before it
+    def asof(self, day):
+        i = np.searchsorted(self.dates, np.datetime64(day, "D"), side="right") - 1
+        return float(self.closes[i]) if i >= 0 else None
+
+def _fetch_history(ticker, timeout=None):
+    if market_data.persist_history:
+        bars = history_store.update(ticker, timeout)
+    else:
+        stats.count("history")
+        bars = market_data.history(ticker, period="2y", timeout=timeout)
+    start = np.searchsorted(bars["day"], _today() - HISTORY_DAYS)
+    return PriceSeries.from_bars(bars[start:])
+
+@stats.timed("get_historical_prices")
 def get_historical_prices(ticker):
+    cached = price_cache.get(("history", ticker))
+    if cached is not None:
+        return cached
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period="2y")
-        if hist.empty:
-            return []
-        prices = [(str(date.date()), float(row["Close"])) for date, row in hist[::-1].iterrows()]
+        prices = _fetch_history(ticker)
+        if prices:
+            price_cache.set(("history", ticker), prices, HISTORY_TTL)
         return prices
     except Exception as e:
         print(f"Error fetching historical prices for {ticker}: {e}")
-        return []
+        return PriceSeries.empty()
+
+# Histories for many tickers, fetched in parallel; failed tickers map to an empty series
+@stats.timed("get_historical_prices_many")
+def get_historical_prices_many(tickers):
+    histories = {}
+    missing = []
+    for ticker in dict.fromkeys(tickers):
+        cached = price_cache.get(("history", ticker))
+        if cached is not None:
+            histories[ticker] = cached
+        else:
+            missing.append(ticker)
+    results, errors = fetch_many(_fetch_history, missing)
+    for ticker in missing:
+        if ticker in errors:
+            print(f"Error fetching historical prices for {ticker}: {errors[ticker]}")
+            histories[ticker] = PriceSeries.empty()
+            continue
+        prices = results[ticker]
+        if prices:
+            price_cache.set(("history", ticker), prices, HISTORY_TTL)
+        histories[ticker] = prices
+    return histories
+
+# Closes for many tickers on one shared date axis: (dates, closes) where closes is
+# len(dates) x len(series). Gaps are forward-filled; days before a ticker's first
+# bar stay NaN.
+def align_closes(series):
+    if not series or not any(series):
+        return np.empty(0, dtype="datetime64[D]"), np.empty((0, len(series)))
+    dates = np.unique(np.concatenate([s.dates for s in series]))
+    closes = np.full((len(dates), len(series)), np.nan)
+    for column, s in enumerate(series):
+        closes[np.searchsorted(dates, s.dates), column] = s.closes
+    rows = np.where(np.isnan(closes), 0, np.arange(len(dates))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return dates, closes[rows, np.arange(len(series))]
+
+def get_price_matrix(tickers):
+    histories = get_historical_prices_many(tickers)
+    return align_closes([histories[ticker] for ticker in tickers])
+
+# Day-over-day returns of an aligned closes matrix; the first row, and any day
+# without a close on both sides, is 0
+def daily_returns(closes):
+    returns = np.zeros_like(closes)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = closes[1:] / closes[:-1] - 1
+    returns[~np.isfinite(returns)] = 0.0
+    return returns
 
 def get_performance(prices, days):
-    if len(prices) < days:
-        return None
-    latest = prices[0][1]
-    past = prices[days-1][1]
-    change = ((latest - past) / past) * 100
-    return change
+    change = compute_performance([prices], [days])[0, 0]
+    return None if np.isnan(change) else float(change)
+
+# Percent change over every horizon for every series, as a len(series) x len(horizons)
+# matrix. A horizon of n days compares the latest close with the one n-1 bars back,
+# and is NaN when the series is shorter than n.
+def compute_performance(series, horizons=PERFORMANCE_HORIZONS):
+    if isinstance(series, PriceSeries):
+        series = [series]
+    if isinstance(horizons, dict):
+        horizons = list(horizons.values())
+    horizons = np.asarray(horizons, dtype=np.intp)
+    lengths = np.fromiter((len(s) for s in series), dtype=np.intp, count=len(series))
+    result = np.full((len(series), len(horizons)), np.nan)
+    if not lengths.any():
+        return result
+    closes = np.concatenate([s.closes for s in series])
+    ends = np.cumsum(lengths)
+    valid = (lengths[:, None] >= horizons[None, :]) & (horizons[None, :] > 0)
+    past_index = np.where(valid, ends[:, None] - horizons[None, :], 0)
+    latest = closes[np.maximum(ends - 1, 0)][:, None]
+    past = closes[past_index]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        changes = (latest - past) / past * 100
+    result[valid] = changes[valid]
+    return result
+
+def format_performance(row, labels=PERFORMANCE_HORIZONS):
+    return " | ".join(
+        f"{label}: N/A" if np.isnan(change) else f"{label}: {change:.2f}%"
+        for label, change in zip(labels, row)
+    )
+
+# Daily mark-to-market value of a Portfolio rebuilt from its trade ledger
+# (purchase_info, sales, deposits) and the aligned closes. Trades become a
+# days x tickers matrix of share deltas whose running sum is the holdings, so
+# value is cash plus one multiply-and-sum against the closes. update() keeps
+# the matrices and only recomputes from the first day touched by new trades or
+# new bars; the latest bar is always redone since today's close still moves.
+class ValueHistory:
+    event_dtype = np.dtype([("day", "datetime64[D]"), ("column", "i8"), ("shares", "f8"), ("cash", "f8")])
+
+    def __init__(self, portfolio):
+        self.portfolio = portfolio
+        self.tickers = []
+        self.series = []  # PriceSeries the aligned closes were built from
+        self.closes = np.empty((0, 0))
+        self.seen = {}  # ledger list: entries already turned into events
+        self.events = np.empty(0, dtype=self.event_dtype)
+        self.dates = np.empty(0, dtype="datetime64[D]")
+        self.holdings = np.empty((0, 0))
+        self.cash = np.empty(0)
+        self.values = np.empty(0)
+
+    def _ledger(self):
+        for ticker, entries in self.portfolio.purchase_info.items():
+            yield ("buy", ticker), ticker, entries, 1
+        for ticker, entries in self.portfolio.sales.items():
+            yield ("sell", ticker), ticker, entries, -1
+        yield ("deposit", None), None, self.portfolio.deposits, 0
+
+    # Ledger entries added since the last call, as event records
+    def _new_events(self, columns):
+        chunks = []
+        for key, ticker, entries, sign in self._ledger():
+            new = entries[self.seen.get(key, 0):]
+            if not new:
+                continue
+            self.seen[key] = len(entries)
+            chunk = np.empty(len(new), dtype=self.event_dtype)
+            chunk["day"] = [entry["date"] for entry in new]
+            if sign:
+                chunk["column"] = columns[ticker]
+                chunk["shares"] = [sign * entry["shares"] for entry in new]
+                chunk["cash"] = -chunk["shares"] * np.array([entry["price"] for entry in new])
+            else:
+                chunk["column"] = -1
+                chunk["shares"] = 0
+                chunk["cash"] = [entry["amount"] for entry in new]
+            chunks.append(chunk)
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=self.event_dtype)
 
+    # Saves from before sells were dated hold fewer shares than the ledger
+    # explains; count the difference as sold at the close of the ticker's last
+    # ledger day.
+    def _unrecorded_sales(self, events, dates, closes):
+        traded = events[events["column"] >= 0]
+        held = np.zeros(len(self.tickers))
+        np.add.at(held, traded["column"], traded["shares"])
+        held -= [self.portfolio.stocks.get(ticker, 0) for ticker in self.tickers]
+        columns = np.flatnonzero(held > 0)
+        sales = np.empty(len(columns), dtype=self.event_dtype)
+        for n, column in enumerate(columns):
+            day = traded["day"][traded["column"] == column].max()
+            row = min(np.searchsorted(dates, day), len(dates) - 1)
+            sales[n] = (day, column, -held[column], held[column] * closes[row, column])
+        return sales
+
+    @stats.timed("ValueHistory.update")
+    def update(self):
+        portfolio = self.portfolio
+        tickers = sorted(set(portfolio.purchase_info) | set(portfolio.sales) | set(portfolio.stocks))
+        histories = get_historical_prices_many(tickers)
+        series = [histories[ticker] for ticker in tickers]
+        if len(series) == len(self.series) and all(a is b for a, b in zip(series, self.series)):
+            dates, closes = self.dates, self.closes  # same cached histories: skip the realignment
+        else:
+            dates, closes = align_closes(series)
+            closes = np.nan_to_num(closes)  # before a ticker's first bar its shares count for nothing
+        if not len(dates):
+            return PriceSeries.empty()
+        known = len(self.dates)
+        if tickers != self.tickers or len(dates) < known or not np.array_equal(dates[:known], self.dates):
+            self.tickers, self.seen, known = tickers, {}, 0
+            events = self._new_events({ticker: column for column, ticker in enumerate(tickers)})
+            self.events = np.concatenate([events, self._unrecorded_sales(events, dates, closes)])
+            new = len(self.events)
+        else:
+            events = self._new_events({ticker: column for column, ticker in enumerate(tickers)})
+            self.events = np.concatenate([self.events, events])
+            new = len(events)
+        # Trades dated after the last bar (today, before the close) land on the last row
+        rows = np.minimum(np.searchsorted(dates, self.events["day"]), len(dates) - 1)
+        start = max(0, min(known - 1, rows[len(rows) - new:].min(initial=known))) if known else 0
+
+        after = rows >= start
+        traded = after & (self.events["column"] >= 0)
+        deltas = np.zeros((len(dates) - start, len(tickers)))
+        flows = np.zeros(len(dates) - start)
+        np.add.at(deltas, (rows[traded] - start, self.events["column"][traded]), self.events["shares"][traded])
+        np.add.at(flows, rows[after] - start, self.events["cash"][after])
+        if start:
+            holdings = self.holdings[start - 1] + np.cumsum(deltas, axis=0)
+            cash = self.cash[start - 1] + np.cumsum(flows)
+            self.holdings = np.vstack([self.holdings[:start], holdings])
+            self.cash = np.concatenate([self.cash[:start], cash])
+        else:
+            # Cash before the first trade is whatever the ledger leaves of today's balance
+            self.holdings = np.cumsum(deltas, axis=0)
+            self.cash = portfolio.balance - self.events["cash"].sum() + np.cumsum(flows)
+        values = self.cash[start:] + (self.holdings[start:] * closes[start:]).sum(axis=1)
+        self.values = np.concatenate([self.values[:start], values])
+        self.dates, self.closes, self.series = dates, closes, series
+        first = rows.min() if len(rows) else len(dates) - 1
+        return PriceSeries(dates[first:], self.values[first:])
+
+# Evenly spaced subset of at most max_points, always keeping the last point
+def downsample(dates, values, max_points=PLOT_MAX_POINTS):
+    if len(values) <= max_points:
+        return dates, values
+    index = np.unique(np.linspace(0, len(values) - 1, max_points).astype(np.intp))
+    return dates[index], values[index]
+
+def _draw_series(ax, prices, title, ylabel="Price ($)"):
+    dates, values = downsample(prices.dates, prices.closes)
+    # Markers only help on short series; on a year of data they dominate draw time
+    ax.plot(dates, values, marker="o" if len(values) <= 30 else None)
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    ax.grid(True, alpha=0.3)
+
+INTERACTIVE_BACKENDS = ("qt", "tk", "gtk", "wx", "macosx", "nbagg", "webagg", "ipympl", "widget")
+
+# Draw into the named figure window, reusing it if it is already open, then either
+# write it to PLOT_DIR or show it without blocking the prompt.
+def _finish_figure(fig, name):
+    fig.tight_layout()
+    backend = plt.get_backend().lower()
+    if PLOT_DIR or not any(key in backend for key in INTERACTIVE_BACKENDS):
+        directory = PLOT_DIR or "."
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.{PLOT_FORMAT}")
+        fig.savefig(path)
+        print(f"Chart saved to {path}")
+        return path
+    plt.show(block=False)
+    plt.pause(0.001)
+    return None
+
+@stats.timed("plot_price_graph")
 def plot_price_graph(prices, title, days=None):
     if not prices:
         print("No data to plot.")
-        return
+        return None
     if days:
-        prices = prices[:days]
-    dates = [date for date, price in reversed(prices)]
-    values = [price for date, price in reversed(prices)]
-    plt.figure(figsize=(8, 4))
-    plt.plot(dates, values, marker='o')
-    plt.title(title)
-    plt.xlabel('Date')
-    plt.ylabel('Price ($)')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.show()
+        prices = prices.tail(days)
+    fig = plt.figure(num="Price Graph", figsize=(8, 4), clear=True)
+    _draw_series(fig.add_subplot(), prices, title)
+    return _finish_figure(fig, title.replace(" ", "_"))
+
+# Year and week panels for one ticker in a single reused figure
+@stats.timed("plot_price_panels")
+def plot_price_panels(prices, ticker, panels=(("Last Year", 252), ("Last Week", 5))):
+    if not prices:
+        print("No data to plot.")
+        return None
+    fig = plt.figure(num="Price Preview", figsize=(8, 3 * len(panels)), clear=True)
+    axes = fig.subplots(len(panels), 1, squeeze=False)[:, 0]
+    for ax, (label, days) in zip(axes, panels):
+        _draw_series(ax, prices.tail(days), f"{ticker} - {label}")
+    return _finish_figure(fig, ticker)
+
+@stats.timed("plot_value_history")
+def plot_value_history(values, title="Portfolio Value"):
+    if not values:
+        print("No portfolio history to plot.")
+        return None
+    fig = plt.figure(num="Portfolio Value", figsize=(8, 4), clear=True)
+    _draw_series(fig.add_subplot(), values, title, ylabel="Value ($)")
+    return _finish_figure(fig, title.replace(" ", "_"))
 
+def _fetch_price(ticker, timeout=None):
+    stats.count("quote")
+    return market_data.quote(ticker, timeout)
+
+@stats.timed("get_price")
 def get_price(ticker):
+    cached = price_cache.get(("price", ticker))
+    if cached is not None:
+        return cached
     try:
-        stock = yf.Ticker(ticker)
-        price = stock.history(period="1d")["Close"]
-        if price.empty:
+        price = _fetch_price(ticker)
+        if price is None:
             print(f"Error: Ticker '{ticker}' not found or no price available.")
             return None
-        return float(price.iloc[-1])
+        price_cache.set(("price", ticker), price, PRICE_TTL)
+        return price
     except Exception as e:
         print(f"Error fetching price for {ticker}: {e}")
         return None
 
+# Quotes for many tickers in one batched download; returns ticker: price (None if unavailable)
+# refresh=True skips the cache and refetches everything; quiet=True keeps errors
+# off the terminal (for the background refresher).
+@stats.timed("get_prices")
+def get_prices(tickers, refresh=False, quiet=False):
+    tickers = list(dict.fromkeys(tickers))
+    quotes = {}
+    missing = []
+    for ticker in tickers:
+        cached = None if refresh else price_cache.get(("price", ticker))
+        if cached is not None:
+            quotes[ticker] = cached
+        else:
+            missing.append(ticker)
+    if not missing:
+        return quotes
+    try:
+        stats.count("batch_quote")
+        fetched = market_data.quotes(missing, timeout=FETCH_TIMEOUT)
+        errors = {}
+    except Exception as e:
+        if not quiet:
+            print(f"Error fetching batched prices, falling back to single quotes: {e}")
+        fetched, errors = fetch_many(_fetch_price, missing)
+    for ticker in missing:
+        price = fetched.get(ticker)
+        if ticker in errors:
+            if not quiet:
+                print(f"Error fetching price for {ticker}: {errors[ticker]}")
+        elif price is None:
+            if not quiet:
+                print(f"Error: Ticker '{ticker}' not found or no price available.")
+        else:
+            price_cache.set(("price", ticker), price, PRICE_TTL)
+        quotes[ticker] = price
+    return quotes
+
+# Whatever quotes are already cached, without fetching: (ticker: price, ticker: age in seconds)
+def quote_snapshot(tickers):
+    quotes, ages = {}, {}
+    for ticker in tickers:
+        price = price_cache.peek(("price", ticker))
+        if price is not None:
+            quotes[ticker] = price
+            ages[ticker] = price_cache.age(("price", ticker))
+    return quotes, ages
+
+def format_age(seconds):
+    if seconds < 60:
+        return f"{seconds:.0f}s old"
+    return f"{seconds / 60:.0f}m old"
+
+# Daemon thread that keeps quotes for tickers() warm in price_cache, so the
+# interactive loop can render from quote_snapshot() without waiting on the network.
+class QuoteRefresher(threading.Thread):
+    def __init__(self, tickers, interval=REFRESH_INTERVAL):
+        super().__init__(name="quote-refresher", daemon=True)
+        self.tickers = tickers
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.refreshed = threading.Event()  # set after every completed pass
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                get_prices(self.tickers(), refresh=True, quiet=True)
+            except Exception:
+                pass  # keep serving the last snapshot; try again next round
+            self.refreshed.set()
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+
 def show_market_menu():
     print("\n--- Market Menu ---")
-    for ticker in DEFAULT_STOCKS:
-        price = get_price(ticker)
-        prices = get_historical_prices(ticker)
+    quotes = get_prices(DEFAULT_STOCKS)
+    histories = get_historical_prices_many(DEFAULT_STOCKS)
+    performance = compute_performance([histories[ticker] for ticker in DEFAULT_STOCKS])
+    for ticker, row in zip(DEFAULT_STOCKS, performance):
+        price = quotes.get(ticker)
         print(f"{ticker}: Current Price: ${price if price else 'N/A'}")
-        if prices:
-            day = get_performance(prices, 2)
-            week = get_performance(prices, 5)
-            month = get_performance(prices, 22)
-            year = get_performance(prices, 252)
-            print(f"  1D: {day:.2f}% | 1W: {week:.2f}% | 1M: {month:.2f}% | 1Y: {year:.2f}%")
+        if histories[ticker]:
+            print(f"  {format_performance(row)}")
         else:
             print("  No historical data available.")
     print("-------------------\n")
@@ -77,8 +963,7 @@ def show_market_menu():
     if ticker:
         prices = get_historical_prices(ticker)
         if prices:
-            plot_price_graph(prices, f"{ticker} - Last Year", days=252)
-            plot_price_graph(prices, f"{ticker} - Last Week", days=5)
+            plot_price_panels(prices, ticker)
         else:
             print("No historical data available for that ticker.")
 
@@ -88,338 +973,504 @@ def show_stock_preview(ticker):
     print(f"\nPreview for {ticker}:")
     print(f"Current Price: ${price if price else 'N/A'}")
     if prices:
-        day = get_performance(prices, 2)
-        week = get_performance(prices, 5)
-        month = get_performance(prices, 22)
-        year = get_performance(prices, 252)
-        print(f"  1D: {day:.2f}% | 1W: {week:.2f}% | 1M: {month:.2f}% | 1Y: {year:.2f}%")
-        plot_price_graph(prices, f"{ticker} - Last Year", days=252)
-        plot_price_graph(prices, f"{ticker} - Last Week", days=5)
+        print(f"  {format_performance(compute_performance(prices)[0])}")
+        plot_price_panels(prices, ticker)
     else:
         print("  No historical data available.")
 
-class Portfolio:
-    def add_funds(self, amount):
-        self.balance += amount
-    def __init__(self, balance):
-        self.balance = balance
-        self.stocks = {}  # ticker: shares
-        self.purchase_info = {}  # ticker: list of {"date": date, "price": price, "shares": shares}
+# One buy or sell in the ledger. A slotted record with an interned date is
+# about a third the size of the {"date", "price", "shares"} dict it replaces;
+# lot["price"] style access still works for code written against the dicts.
+class Lot:
+    __slots__ = ("date", "price", "shares")
 
-    def buy(self, ticker, shares, price):
-        cost = shares * price
-        if cost > self.balance:
-            print(f"Not enough balance! You have {self.balance:.2f} and you need {cost:.2f} to afford that stock!")
-            return False
-        self.balance -= cost
-        self.stocks[ticker] = self.stocks.get(ticker, 0) + shares
-        from datetime import datetime
-        if ticker not in self.purchase_info:
-            self.purchase_info[ticker] = []
-        self.purchase_info[ticker].append({
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "price": price,
-            "shares": shares
-        })
-        print(f"Bought {shares} shares of {ticker} at ${price:.2f} each.")
-        return True
+    def __init__(self, date, price, shares):
+        self.date = sys.intern(date) if isinstance(date, str) else date
+        self.price = price
+        self.shares = shares
 
-    def sell(self, ticker, shares, price):
-        if self.stocks.get(ticker, 0) < shares:
-            print("Not enough shares!")
-            return False
-        self.stocks[ticker] -= shares
-        self.balance += shares * price
-        print(f"Sold {shares} shares of {ticker} at ${price:.2f} each.")
-        return True
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
 
-    def get_net_worth(self):
-        total = self.balance
-        for ticker, shares in self.stocks.items():
-            price = get_price(ticker)
-            if price:
-                total += shares * price
-        return total
+    def __eq__(self, other):
+        if isinstance(other, (Lot, dict)):
+            return (self.date, self.price, self.shares) == (other["date"], other["price"], other["shares"])
+        return NotImplemented
 
-    def get_net_worth_change_since_last_save(self, filename="portfolio_save.json"):
-        if not os.path.exists(filename):
-            return None, None
-        with open(filename, "r") as f:
-            data = json.load(f)
-        last_balance = data.get("balance", START_BALANCE)
-        last_stocks = data.get("stocks", {})
-        last_total = last_balance
-        for ticker, shares in last_stocks.items():
-            prices = get_historical_prices(ticker)
-            last_price = prices[0][1] if prices else 0
-            last_total += shares * last_price
-        current_total = self.get_net_worth()
-        change = current_total - last_total
-        percent = (change / last_total * 100) if last_total else 0
-        return change, percent
+    def __repr__(self):
+        return f"Lot({self.date!r}, {self.price!r}, {self.shares!r})"
 
-    def get_stock_performance_since_last_save(self, filename="portfolio_save.json"):
-        if not os.path.exists(filename):
-            return {}
-        with open(filename, "r") as f:
-            data = json.load(f)
-        last_stocks = data.get("stocks", {})
-        performance = {}
-        for ticker, shares in self.stocks.items():
-            prices = get_historical_prices(ticker)
-            if not prices:
-                performance[ticker] = "No historical data available."
-                continue
-            last_price = prices[0][1]
-            current_price = get_price(ticker)
-            if current_price is None:
-                performance[ticker] = "Current price unavailable."
-                continue
-            change = ((current_price - last_price) / last_price) * 100 if last_price else 0
-            if change > 0:
-                color = Fore.GREEN
-            elif change < 0:
-                color = Fore.RED
-            else:
-                color = Style.RESET_ALL
-            performance[ticker] = f"{shares} shares | Last: ${last_price:.2f} | Now: ${current_price:.2f} | Change: {color}{change:.2f}%{Style.RESET_ALL}"
-        return performance
+    def to_dict(self):
+        return {"date": self.date, "price": self.price, "shares": self.shares}
 
-    def get_portfolio_change_since_purchase(self):
-        summary = {}
-        for ticker, shares in self.stocks.items():
-            current_price = get_price(ticker)
-            if ticker in self.purchase_info:
-                total_purchased = sum([p["shares"] for p in self.purchase_info[ticker]])
-                avg_purchase_price = sum([p["price"] * p["shares"] for p in self.purchase_info[ticker]]) / total_purchased if total_purchased else 0
-                change = ((current_price - avg_purchase_price) / avg_purchase_price * 100) if avg_purchase_price else 0
-                summary[ticker] = {
-                    "shares": shares,
-                    "avg_purchase_price": avg_purchase_price,
-                    "current_price": current_price,
-                    "change": change
-                }
-            else:
-                summary[ticker] = "No purchase info."
-        return summary
+    @staticmethod
+    def from_dict(data):
+        if isinstance(data, Lot):
+            return data
+        return Lot(data["date"], data["price"], data["shares"])
 
-    def save(self, filename="portfolio_save.json"):
-        data = {
-            "balance": self.balance,
-            "stocks": self.stocks,
-            "purchase_info": self.purchase_info
-        }
-        with open(filename, "w") as f:
-            json.dump(data, f)
+def _lots_from_dicts(ledger):
+    return {ticker: [Lot.from_dict(entry) for entry in entries] for ticker, entries in ledger.items()}
 
-    @staticmethod
-    def load(filename="portfolio_save.json"):
-        if not os.path.exists(filename):
-            return Portfolio(START_BALANCE)
-        with open(filename, "r") as f:
-            data = json.load(f)
-        portfolio = Portfolio(data.get("balance", START_BALANCE))
-        portfolio.stocks = data.get("stocks", {})
-        portfolio.purchase_info = data.get("purchase_info", {})
-        return portfolio
+# json.dumps hook for the record classes in a snapshot
+def _json_default(obj):
+    if isinstance(obj, Lot):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
-    def show(self):
-        print(f"Balance: ${self.balance:.2f}")
-        print(f"Net Worth: ${self.get_net_worth():.2f}")
-        print("Portfolio:")
-        for ticker, shares in self.stocks.items():
-            price = get_price(ticker)
-            color = Style.RESET_ALL
-            change_str = ""
-            value_str = ""
-            if hasattr(self, 'purchase_info') and ticker in self.purchase_info and self.purchase_info[ticker]:
-                total_purchased = sum([p["shares"] for p in self.purchase_info[ticker]])
-                avg_purchase_price = sum([p["price"] * p["shares"] for p in self.purchase_info[ticker]]) / total_purchased if total_purchased else 0
-                change = ((price - avg_purchase_price) / avg_purchase_price * 100) if avg_purchase_price else 0
-                value = shares * price if price is not None else 0
-                if change > 0:
-                    color = Fore.GREEN
-                elif change < 0:
-                    color = Fore.RED
-                change_str = f" | Change: {color}{change:.2f}%{Style.RESET_ALL}"
-                value_str = f" | Value: {color}${value:.2f}{Style.RESET_ALL}"
-            print(f"  {color}{ticker}{Style.RESET_ALL}: {shares} shares{value_str}{change_str}")
+# Running cost basis for one ticker, kept up to date by Portfolio.buy / sell
+# so nothing has to rescan purchase_info. With "fifo" / "lifo" the open lots
+# are kept as Lot records and sells consume them from one end.
+class Position:
+    __slots__ = ("quantity", "total_cost", "realized_pnl", "lots")
 
-    def show_market_value(self):
-        total_value = 0.0
-        print("\nCurrent Market Value of Portfolio:")
-        for ticker, shares in self.stocks.items():
-            price = get_price(ticker)
-            if price is not None:
-                value = shares * price
-                total_value += value
-                print(f"  {ticker}: {shares} shares x ${price:.2f} = ${value:.2f}")
-            else:
-                print(f"  {ticker}: {shares} shares (price unavailable)")
-        print(f"Total Market Value of Holdings: ${total_value:.2f}\n")
+    def __init__(self, lot_method="average"):
+        self.quantity = 0
+        self.total_cost = 0.0
+        self.realized_pnl = 0.0
+        self.lots = None if lot_method == "average" else deque()
 
-def main():
-    print("Welcome to the Stock Trading Game!")
-    while True:
-        choice = input("Type 'new' to start a new game or 'continue' to load your previous game: ").strip().lower()
-        if choice == "new":
-            portfolio = Portfolio(START_BALANCE)
-            print("Starting a new game!")
-            break
-        elif choice == "continue":
-            portfolio = Portfolio.load()
-            print("Continuing your previous game!")
-            print("\n--- Portfolio Performance Since Last Save ---")
-            change, percent = portfolio.get_net_worth_change_since_last_save()
-            if change is not None:
-                if change > 0:
-                    color = Fore.GREEN
-                elif change < 0:
-                    color = Fore.RED
-                else:
-                    color = Style.RESET_ALL
-                print(f"Net Worth Change Since Last Check-in: {color}${change:.2f} ({percent:.2f}%){Style.RESET_ALL}")
-            print("\n--- Portfolio Change Since Purchase ---")
-            purchase_summary = portfolio.get_portfolio_change_since_purchase()
-            for ticker, info in purchase_summary.items():
-                if isinstance(info, dict):
-                    c = Fore.GREEN if info["change"] > 0 else (Fore.RED if info["change"] < 0 else Style.RESET_ALL)
-                    print(f"{ticker}: {info['shares']} shares | Avg Purchase: ${info['avg_purchase_price']:.2f} | Now: ${info['current_price']:.2f} | Change: {c}{info['change']:.2f}%{Style.RESET_ALL}")
-                else:
-                    print(f"{ticker}: {info}")
-            print("--------------------------------------------\n")
-            show_graph = input("Would you like to see a graph of your portfolio value over time? (yes/no): ").strip().lower()
-            if show_graph == "yes":
-                dates = []
-                values = []
-                for ticker, purchases in portfolio.purchase_info.items():
-                    for p in purchases:
-                        dates.append(p["date"])
-                        values.append(p["price"] * p["shares"])
-                if dates and values:
-                    plt.figure(figsize=(8,4))
-                    plt.plot(dates, values, marker='o')
-                    plt.title("Portfolio Value at Purchase Dates")
-                    plt.xlabel("Date")
-                    plt.ylabel("Value ($)")
-                    plt.xticks(rotation=45)
-                    plt.tight_layout()
-                    plt.show()
-                else:
-                    print("No purchase history to plot.")
-            break
-        else:
-            print("Invalid choice. Please type 'new' or 'continue'.")
+    @property
+    def avg_price(self):
+        return self.total_cost / self.quantity if self.quantity else 0
 
-    while True:
-        portfolio.show()
-        portfolio.show_market_value()
-        print("Type 'market' to view available stocks.")
-        action = input("Buy, Sell, Market, or Quit? ").strip().lower()
-        if action == "quit":
-            portfolio.save()
-            print("Progress saved. Goodbye!")
-            break
-        elif action == "market":
-            show_market_menu()
-            continue
-        ticker = input("Enter stock ticker (e.g., AAPL): ").strip().upper()
-        if action == "buy":
-            DoubleCheckValue = input("Would you like to see graphs before you buy (yes/no)? ")
-            if DoubleCheckValue.lower() == "yes":
-                show_stock_preview(ticker)
-            else:
-                print("No graphs will be shown.")
-            confirm = input("Do you want to proceed with the buy? (yes/no): ").strip().lower()
-            if confirm != "yes":
-                print("Buy cancelled.")
-                continue
-        price = get_price(ticker)
-        if price is None:
-            continue
-        print(f"Current price of {ticker}: ${price:.2f}")
-        shares = int(input("How many shares? "))
-        if action == "buy":
-            portfolio.buy(ticker, shares, price)
-        elif action == "sell":
-            portfolio.sell(ticker, shares, price)
+    def add(self, shares, price):
+        self.quantity += shares
+        self.total_cost += shares * price
+        if self.lots is not None:
+            self.lots.append(Lot(None, price, shares))
+
+    def remove(self, shares, price, lot_method="average"):
+        if self.lots is None:
+            cost = self.avg_price * shares
         else:
-            print("Invalid action.")
-        print()
-        time.sleep(1)
+            cost = 0.0
+            remaining = shares
+            while remaining and self.lots:
+                lot = self.lots[0] if lot_method == "fifo" else self.lots[-1]
+                used = min(remaining, lot.shares)
+                cost += used * lot.price
+                lot.shares -= used
+                remaining -= used
+                if not lot.shares:
+                    if lot_method == "fifo":
+                        self.lots.popleft()
+                    else:
+                        self.lots.pop()
+        self.quantity -= shares
+        self.total_cost = self.total_cost - cost if self.quantity else 0.0
+        if price is not None:
+            self.realized_pnl += shares * price - cost
 
-if __name__ == "__main__":
-    main()
-from colorama import init, Fore, Style
-init(autoreset=True)
-from sys import platform
-import json
-import os
-import matplotlib.pyplot as plt
-import time
-import yfinance as yf
+    def to_dict(self):
+        data = {"quantity": self.quantity, "total_cost": self.total_cost, "realized_pnl": self.realized_pnl}
+        if self.lots is not None:
+            data["lots"] = [[lot.shares, lot.price] for lot in self.lots]
+        return data
 
-# Starting fictional balance
-START_BALANCE = 10000.0
+    @staticmethod
+    def from_dict(data, lot_method="average"):
+        position = Position(lot_method)
+        position.quantity = data.get("quantity", 0)
+        position.total_cost = data.get("total_cost", 0.0)
+        position.realized_pnl = data.get("realized_pnl", 0.0)
+        if position.lots is not None:
+            position.lots.extend(Lot(None, price, shares) for shares, price in data.get("lots", []))
+        return position
 
-# List of default stocks for the market menu
-DEFAULT_STOCKS = ["AAPL", "MSFT", "TSLA", "AMZN", "GOOG", "NVDA", "PLTR"]
+# Snapshot serializers. save() picks one from the file extension (or an explicit
+# format name), load() sniffs the file header, so either can read both.
+class JsonSaveFormat:
+    name = "json"
+
+    def dump(self, data, f):
+        f.write(json.dumps(data, default=_json_default).encode())
+
+    def load(self, f):
+        return json.load(f)
+
+# Binary snapshot for large trade histories: a JSON header with everything but
+# the lots, followed by purchase_info and then sales packed as fixed-width
+# lot_dtype records. Saves from before sales were packed keep them in the header.
+class BinarySaveFormat:
+    name = "binary"
+    magic = b"PFSAVE1\n"
+    header = np.dtype("<u8")
+    lot_dtype = np.dtype([("ticker", "<i4"), ("day", "<i4"), ("price", "<f8"), ("shares", "<i8")])
+
+    def _pack(self, ledger):
+        tickers = list(ledger)
+        counts = [len(ledger[ticker]) for ticker in tickers]
+        lots = np.empty(sum(counts), dtype=self.lot_dtype)
+        lots["ticker"] = np.repeat(np.arange(len(tickers), dtype="<i4"), counts)
+        flat = [p for ticker in tickers for p in ledger[ticker]]
+        lots["day"] = np.array([p["date"] for p in flat], dtype="datetime64[D]").astype("<i4")
+        lots["price"] = [p["price"] for p in flat]
+        lots["shares"] = [p["shares"] for p in flat]
+        return tickers, lots
+
+    def _unpack(self, tickers, lots):
+        # Format each distinct day once; lots on the same day share the string
+        days, inverse = np.unique(lots["day"], return_inverse=True)
+        names = [sys.intern(name) for name in days.astype("datetime64[D]").astype(str).tolist()]
+        dates = [names[i] for i in inverse.tolist()]
+        prices = lots["price"].tolist()
+        shares = lots["shares"].tolist()
+        bounds = np.searchsorted(lots["ticker"], np.arange(len(tickers) + 1)).tolist()
+        return {
+            ticker: [Lot(dates[i], prices[i], shares[i]) for i in range(bounds[n], bounds[n + 1])]
+            for n, ticker in enumerate(tickers)
+        }
+
+    def dump(self, data, f):
+        lot_tickers, lots = self._pack(data.get("purchase_info", {}))
+        sale_tickers, sales = self._pack(data.get("sales", {}))
+        header = {key: value for key, value in data.items() if key not in ("purchase_info", "sales")}
+        header["lot_tickers"] = lot_tickers
+        header["sale_tickers"] = sale_tickers
+        header["sale_lots"] = len(sales)
+        header = json.dumps(header, default=_json_default).encode()
+        f.write(self.magic)
+        f.write(np.array(len(header), dtype=self.header).tobytes())
+        f.write(header)
+        f.write(lots.tobytes())
+        f.write(sales.tobytes())
+
+    def load(self, f):
+        f.read(len(self.magic))
+        size = int(np.frombuffer(f.read(self.header.itemsize), dtype=self.header)[0])
+        data = json.loads(f.read(size))
+        lots = np.frombuffer(f.read(), dtype=self.lot_dtype)
+        split = len(lots) - data.pop("sale_lots", 0)
+        data["purchase_info"] = self._unpack(data.pop("lot_tickers"), lots[:split])
+        if "sale_tickers" in data:
+            data["sales"] = self._unpack(data.pop("sale_tickers"), lots[split:])
+        return data
+
+SAVE_FORMATS = {"json": JsonSaveFormat(), "binary": BinarySaveFormat()}
+SAVE_EXTENSIONS = {".json": "json", ".pfb": "binary"}
+
+def save_format_for(filename, fmt=None):
+    if fmt is None:
+        fmt = SAVE_EXTENSIONS.get(os.path.splitext(filename)[1].lower(), "json")
+    if fmt not in SAVE_FORMATS:
+        raise ValueError(f"Unknown save format {fmt!r}; expected one of {list(SAVE_FORMATS)}")
+    return SAVE_FORMATS[fmt]
+
+def read_save_file(filename):
+    with open(filename, "rb") as f:
+        binary = f.read(len(BinarySaveFormat.magic)) == BinarySaveFormat.magic
+        f.seek(0)
+        return SAVE_FORMATS["binary" if binary else "json"].load(f)
+
+def write_save_file(filename, data, fmt=None):
+    save_format = save_format_for(filename, fmt)
+    # Write beside the old file and swap it in, so a crash mid-save leaves
+    # the previous snapshot (and its journal) intact.
+    tmp = filename + ".tmp"
+    with open(tmp, "wb") as f:
+        save_format.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+
+# Convert a save between formats, e.g. portfolio_save.json -> portfolio_save.pfb
+def migrate_save(source, destination, fmt=None):
+    write_save_file(destination, read_save_file(source), fmt)
+    # Always replace the destination journal: a stale one would replay its
+    # records on top of the migrated snapshot.
+    journal = source + ".journal"
+    with open(destination + ".journal", "wb") as dst:
+        if os.path.exists(journal):
+            with open(journal, "rb") as src:
+                dst.write(src.read())
 
-# Helper to get historical prices for a ticker using yfinance
+def _file_date(path):
+    return str(np.datetime64(int(os.path.getmtime(path)), "s").astype("datetime64[D]"))
+
+# Append-only log of trades made since the last snapshot, one JSON object per
+# line, fsynced on every append so a crash loses at most the trade in flight.
+class TradeJournal:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.torn_at = None  # byte offset of a torn tail found by records()
+
+    def append(self, record):
+        if self.file is None:
+            self.file = open(self.path, "a")
+            if self.torn_at is not None:
+                # Drop the torn tail first, or this record would land on its line
+                self.file.truncate(self.torn_at)
+                self.torn_at = None
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def records(self):
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated record")
+                    records.append(json.loads(line))
+                except ValueError:
+                    self.torn_at = offset  # torn write from a crash; nothing after it was committed
+                    break
+                offset += len(line)
+        return records
+
+    def reset(self):
+        self.close()
+        open(self.path, "w").close()
+        self.torn_at = None
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
 
-# --- Clean Portfolio class ---
 class Portfolio:
-    def __init__(self, balance):
+    def add_funds(self, amount, date=None):
+        if date is None:
+            date = str(np.datetime64("today", "D"))
+        self._apply_deposit(amount, date)
+        self._record("add_funds", amount=amount, date=date)
+    def __init__(self, balance, lot_method="average"):
+        if lot_method not in LOT_METHODS:
+            raise ValueError(f"lot_method must be one of {LOT_METHODS}, not {lot_method!r}")
         self.balance = balance
+        self.lot_method = lot_method
         self.stocks = {}  # ticker: shares
-        self.purchase_info = {}  # ticker: list of {"date": date, "price": price, "shares": shares}
+        self.purchase_info = {}  # ticker: list of Lot
+        self.sales = {}  # ticker: list of Lot
+        self.deposits = []  # list of {"date": date, "amount": amount}
+        self.positions = {}  # ticker: Position
+        self.journal = None
+        self.save_file = None
+        self.journal_seq = 0  # sequence number of the last journaled trade
+        self.snapshot_seq = 0  # journal_seq covered by the last snapshot
+        self.last_save = None  # {"balance", "stocks", "prices", "saved_at"} of the last snapshot
+        self.last_save_file = None
+        self.save_format = None  # None: pick from the save file's extension
+        self._value_history = None
+        self.open_orders = {}  # order id: Order resting in an OrderBook
 
-    def buy(self, ticker, shares, price):
+    def buy(self, ticker, shares, price, date=None):
         cost = shares * price
         if cost > self.balance:
-            print("Not enough balance!")
+            print(f"Not enough balance! You have {self.balance:.2f} and you need {cost:.2f} to afford that stock!")
             return False
-        self.balance -= cost
-        self.stocks[ticker] = self.stocks.get(ticker, 0) + shares
-        from datetime import datetime
-        if ticker not in self.purchase_info:
-            self.purchase_info[ticker] = []
-        self.purchase_info[ticker].append({
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "price": price,
-            "shares": shares
-        })
+        if date is None:
+            from datetime import datetime
+            date = datetime.now().strftime("%Y-%m-%d")
+        self._apply_buy(ticker, shares, price, date)
+        self._record("buy", ticker=ticker, shares=shares, price=price, date=date)
         print(f"Bought {shares} shares of {ticker} at ${price:.2f} each.")
         return True
 
-    def sell(self, ticker, shares, price):
+    def sell(self, ticker, shares, price, date=None):
         if self.stocks.get(ticker, 0) < shares:
             print("Not enough shares!")
             return False
-        self.stocks[ticker] -= shares
-        self.balance += shares * price
+        if date is None:
+            date = str(np.datetime64("today", "D"))
+        self._apply_sell(ticker, shares, price, date)
+        self._record("sell", ticker=ticker, shares=shares, price=price, date=date)
         print(f"Sold {shares} shares of {ticker} at ${price:.2f} each.")
         return True
 
-    def get_net_worth(self):
+    def _apply_buy(self, ticker, shares, price, date):
+        self.balance -= shares * price
+        self.stocks[ticker] = self.stocks.get(ticker, 0) + shares
+        if ticker not in self.purchase_info:
+            self.purchase_info[ticker] = []
+        self.purchase_info[ticker].append(Lot(date, price, shares))
+        if ticker not in self.positions:
+            self.positions[ticker] = Position(self.lot_method)
+        self.positions[ticker].add(shares, price)
+
+    # Journals written before sells were dated replay with date=None; those
+    # sells stay out of the ledger like sells in old snapshots.
+    def _apply_sell(self, ticker, shares, price, date=None):
+        self.stocks[ticker] -= shares
+        self.balance += shares * price
+        if date is not None:
+            self.sales.setdefault(ticker, []).append(Lot(date, price, shares))
+        if ticker in self.positions:
+            self.positions[ticker].remove(shares, price, self.lot_method)
+
+    def _apply_trade(self, trade):
+        if trade["op"] == "buy":
+            self._apply_buy(trade["ticker"], trade["shares"], trade["price"], trade["date"])
+        else:
+            self._apply_sell(trade["ticker"], trade["shares"], trade["price"], trade["date"])
+
+    # Apply many trades all or nothing. Orders are dicts with "action" (buy or
+    # sell), "ticker", "shares" and optionally "price"; tickers without a price
+    # are quoted in one get_prices() call. Every trade is checked against the
+    # running balance and holdings before any is applied, and the batch goes to
+    # the journal as one record: one fsync, and it replays whole or not at all.
+    @stats.timed("Portfolio.execute_batch")
+    def execute_batch(self, orders, quotes=None, date=None):
+        if date is None:
+            date = str(np.datetime64("today", "D"))
+        orders = list(orders)
+        if quotes is None:
+            unpriced = [str(order.get("ticker", "")).strip().upper() for order in orders if order.get("price") in (None, "")]
+            quotes = get_prices(unpriced, quiet=True) if unpriced else {}
+        trades, problems = [], []
+        balance = self.balance
+        held = {}
+        for n, order in enumerate(orders, 1):
+            action = str(order.get("action", "")).strip().lower()
+            ticker = str(order.get("ticker", "")).strip().upper()
+            try:
+                shares = float(order.get("shares"))
+                price = quotes.get(ticker) if order.get("price") in (None, "") else float(order["price"])
+            except (TypeError, ValueError):
+                problems.append(f"order {n}: shares and price must be numbers")
+                continue
+            whole = shares.is_integer()  # False for fractions, NaN and inf
+            if whole:
+                shares = int(shares)
+            owned = held.get(ticker, self.stocks.get(ticker, 0))
+            if action not in ("buy", "sell"):
+                problems.append(f"order {n}: unknown action {action!r}")
+            elif not whole or shares <= 0:
+                problems.append(f"order {n}: shares must be a positive whole number, got {order.get('shares')}")
+            elif price is None:
+                problems.append(f"order {n}: no price available for {ticker}")
+            elif not np.isfinite(price) or price <= 0:
+                problems.append(f"order {n}: price must be a positive number, got {price}")
+            elif action == "buy" and shares * price > balance:
+                problems.append(f"order {n}: buying {shares} {ticker} needs ${shares * price:.2f}, ${balance:.2f} left")
+            elif action == "sell" and shares > owned:
+                problems.append(f"order {n}: selling {shares} {ticker} but only {owned} held")
+            else:
+                balance += shares * price if action == "sell" else -shares * price
+                held[ticker] = owned + (shares if action == "buy" else -shares)
+                trades.append({"op": action, "ticker": ticker, "shares": shares, "price": price, "date": date})
+        if problems:
+            more = f"\n...and {len(problems) - 10} more" if len(problems) > 10 else ""
+            raise ValueError("Batch rejected, nothing was traded:\n" + "\n".join(problems[:10]) + more)
+        for trade in trades:
+            self._apply_trade(trade)
+        if trades:
+            self._record("batch", trades=trades)
+        return trades
+
+    def _apply_deposit(self, amount, date=None):
+        self.balance += amount
+        if date is not None:
+            self.deposits.append({"date": date, "amount": amount})
+
+    # Journal every trade to <save file>.journal; save() then only has to run
+    # every JOURNAL_COMPACT_EVERY trades (and on quit) to compact it.
+    def attach_journal(self, filename="portfolio_save.json"):
+        self.save_file = filename
+        self.journal = TradeJournal(filename + ".journal")
+
+    def _record(self, op, **fields):
+        if self.journal is None:
+            return
+        self.journal_seq += 1
+        self.journal.append({"seq": self.journal_seq, "op": op, **fields})
+        if self.journal_seq - self.snapshot_seq >= JOURNAL_COMPACT_EVERY:
+            self.save(self.save_file)
+
+    def _replay(self, records):
+        for record in records:
+            if record["seq"] <= self.journal_seq:
+                continue
+            if record["op"] == "buy":
+                self._apply_buy(record["ticker"], record["shares"], record["price"], record["date"])
+            elif record["op"] == "sell":
+                self._apply_sell(record["ticker"], record["shares"], record["price"], record.get("date"))
+            elif record["op"] == "add_funds":
+                self._apply_deposit(record["amount"], record.get("date"))
+            elif record["op"] == "batch":
+                for trade in record["trades"]:
+                    self._apply_trade(trade)
+            self.journal_seq = record["seq"]
+
+    # Rebuild positions from purchase_info for saves written before positions were
+    # stored. Sells were not recorded, so shares missing from stocks are taken out
+    # at cost (or oldest/newest lots first) with no realized P&L.
+    def rebuild_positions(self):
+        self.positions = {}
+        for ticker, purchases in self.purchase_info.items():
+            position = Position(self.lot_method)
+            for lot in purchases:
+                position.add(lot.shares, lot.price)
+            sold = position.quantity - self.stocks.get(ticker, 0)
+            if sold > 0:
+                position.remove(sold, None, self.lot_method)
+            self.positions[ticker] = position
+
+    # Daily account value since the first trade, kept up to date incrementally
+    def value_history(self):
+        if self._value_history is None:
+            self._value_history = ValueHistory(self)
+        return self._value_history.update()
+
+    @stats.timed("Portfolio.get_net_worth")
+    def get_net_worth(self, quotes=None):
+        if quotes is None:
+            quotes = get_prices(self.stocks)
         total = self.balance
         for ticker, shares in self.stocks.items():
-            price = get_price(ticker)
+            price = quotes.get(ticker)
             if price:
                 total += shares * price
         return total
 
+    def _set_last_save(self, data, filename, saved_at=None):
+        self.last_save = {
+            "balance": data.get("balance", START_BALANCE),
+            "stocks": dict(data.get("stocks", {})),
+            "prices": dict(data.get("prices", {})),
+            "saved_at": data.get("saved_at", saved_at)
+        }
+        self.last_save_file = filename
+
+    # The snapshot "since last save" figures compare against. Kept in memory by
+    # load() / save(), so the file is only read here for a different filename.
+    def last_save_baseline(self, filename="portfolio_save.json"):
+        if self.last_save is None or self.last_save_file != filename:
+            if not os.path.exists(filename):
+                return None
+            self._set_last_save(read_save_file(filename), filename, _file_date(filename))
+        return self.last_save
+
+    # Saves written before quotes were recorded only have holdings, so look up
+    # the close on the save date once and remember it.
+    def _last_save_prices(self, baseline, tickers):
+        prices = baseline["prices"]
+        missing = [ticker for ticker in tickers if ticker not in prices]
+        if missing and baseline["saved_at"]:
+            histories = get_historical_prices_many(missing)
+            for ticker in missing:
+                if histories[ticker]:
+                    prices[ticker] = histories[ticker].asof(baseline["saved_at"])
+        return prices
+
     def get_net_worth_change_since_last_save(self, filename="portfolio_save.json"):
-        if not os.path.exists(filename):
+        baseline = self.last_save_baseline(filename)
+        if baseline is None:
             return None, None
-        with open(filename, "r") as f:
-            data = json.load(f)
-        last_balance = data.get("balance", START_BALANCE)
-        last_stocks = data.get("stocks", {})
-        last_total = last_balance
+        last_stocks = baseline["stocks"]
+        last_total = baseline["balance"]
+        last_prices = self._last_save_prices(baseline, last_stocks)
         for ticker, shares in last_stocks.items():
-            prices = get_historical_prices(ticker)
-            last_price = prices[0][1] if prices else 0
+            last_price = last_prices.get(ticker) or 0
             last_total += shares * last_price
         current_total = self.get_net_worth()
         change = current_total - last_total
@@ -427,19 +1478,18 @@ class Portfolio:
         return change, percent
 
     def get_stock_performance_since_last_save(self, filename="portfolio_save.json"):
-        if not os.path.exists(filename):
+        baseline = self.last_save_baseline(filename)
+        if baseline is None:
             return {}
-        with open(filename, "r") as f:
-            data = json.load(f)
-        last_stocks = data.get("stocks", {})
         performance = {}
+        last_prices = self._last_save_prices(baseline, self.stocks)
+        quotes = get_prices(self.stocks)
         for ticker, shares in self.stocks.items():
-            prices = get_historical_prices(ticker)
-            if not prices:
-                performance[ticker] = "No historical data available."
+            last_price = last_prices.get(ticker)
+            if last_price is None:
+                performance[ticker] = "No price recorded at last save."
                 continue
-            last_price = prices[0][1]
-            current_price = get_price(ticker)
+            current_price = quotes.get(ticker)
             if current_price is None:
                 performance[ticker] = "Current price unavailable."
                 continue
@@ -453,13 +1503,15 @@ class Portfolio:
             performance[ticker] = f"{shares} shares | Last: ${last_price:.2f} | Now: ${current_price:.2f} | Change: {color}{change:.2f}%{Style.RESET_ALL}"
         return performance
 
+    @stats.timed("Portfolio.get_portfolio_change_since_purchase")
     def get_portfolio_change_since_purchase(self):
         summary = {}
+        quotes = get_prices(self.stocks)
         for ticker, shares in self.stocks.items():
-            current_price = get_price(ticker)
-            if ticker in self.purchase_info:
-                total_purchased = sum([p["shares"] for p in self.purchase_info[ticker]])
-                avg_purchase_price = sum([p["price"] * p["shares"] for p in self.purchase_info[ticker]]) / total_purchased if total_purchased else 0
+            current_price = quotes.get(ticker)
+            position = self.positions.get(ticker)
+            if position is not None and current_price is not None:
+                avg_purchase_price = position.avg_price
                 change = ((current_price - avg_purchase_price) / avg_purchase_price * 100) if avg_purchase_price else 0
                 summary[ticker] = {
                     "shares": shares,
@@ -467,42 +1519,88 @@ class Portfolio:
                     "current_price": current_price,
                     "change": change
                 }
-            else:
+            elif position is None:
                 summary[ticker] = "No purchase info."
+            else:
+                summary[ticker] = "Current price unavailable."
         return summary
 
-    def save(self, filename="portfolio_save.json"):
-        data = {
+    # Everything save() writes, with its own copies of the containers so it can
+    # be written out on another thread while trading carries on.
+    def snapshot(self):
+        return {
             "balance": self.balance,
-            "stocks": self.stocks,
-            "purchase_info": self.purchase_info
+            "stocks": dict(self.stocks),
+            "purchase_info": {ticker: list(lots) for ticker, lots in self.purchase_info.items()},
+            "sales": {ticker: list(lots) for ticker, lots in self.sales.items()},
+            "deposits": list(self.deposits),
+            "lot_method": self.lot_method,
+            "positions": {ticker: position.to_dict() for ticker, position in self.positions.items()},
+            "journal_seq": self.journal_seq,
+            "orders": [order.to_dict() for order in self.open_orders.values()],
+            "prices": {ticker: price for ticker in self.stocks if (price := price_cache.peek(("price", ticker))) is not None},
+            "saved_at": str(np.datetime64("today", "D"))
         }
-        with open(filename, "w") as f:
-            json.dump(data, f)
+
+    def save(self, filename="portfolio_save.json", fmt=None):
+        data = self.snapshot()
+        write_save_file(filename, data, fmt or self.save_format)
+        self.snapshot_seq = self.journal_seq
+        self._set_last_save(data, filename)
+        if self.journal is not None and filename == self.save_file:
+            self.journal.reset()
 
     @staticmethod
-    def load(filename="portfolio_save.json"):
+    def load(filename="portfolio_save.json", lot_method="average", journal=True):
         if not os.path.exists(filename):
-            return Portfolio(START_BALANCE)
-        with open(filename, "r") as f:
-            data = json.load(f)
-        portfolio = Portfolio(data.get("balance", START_BALANCE))
+            portfolio = Portfolio(START_BALANCE, lot_method)
+            data = {}
+        else:
+            data = read_save_file(filename)
+            portfolio = Portfolio._from_snapshot(data, lot_method)
+            portfolio._set_last_save(data, filename, _file_date(filename))
+        if journal:
+            portfolio.attach_journal(filename)
+            portfolio._replay(portfolio.journal.records())
+        return portfolio
+
+    @staticmethod
+    def _from_snapshot(data, lot_method="average"):
+        portfolio = Portfolio(data.get("balance", START_BALANCE), data.get("lot_method", lot_method))
         portfolio.stocks = data.get("stocks", {})
-        portfolio.purchase_info = data.get("purchase_info", {})
+        portfolio.purchase_info = _lots_from_dicts(data.get("purchase_info", {}))
+        portfolio.sales = _lots_from_dicts(data.get("sales", {}))
+        portfolio.deposits = data.get("deposits", [])
+        # Saved orders get fresh ids once an OrderBook restores them
+        for n, order in enumerate(data.get("orders", [])):
+            portfolio.open_orders[n] = Order.from_dict(order, portfolio)
+        if "positions" in data:
+            portfolio.positions = {
+                ticker: Position.from_dict(position, portfolio.lot_method)
+                for ticker, position in data["positions"].items()
+            }
+        else:
+            portfolio.rebuild_positions()
+        portfolio.journal_seq = portfolio.snapshot_seq = data.get("journal_seq", 0)
         return portfolio
 
-    def show(self):
+    # quotes / ages come from quote_snapshot() when rendering off the background
+    # refresher; without them quotes are fetched here.
+    @stats.timed("Portfolio.show")
+    def show(self, quotes=None, ages=None):
+        if quotes is None:
+            quotes = get_prices(self.stocks)
         print(f"Balance: ${self.balance:.2f}")
-        print(f"Net Worth: ${self.get_net_worth():.2f}")
+        print(f"Net Worth: ${self.get_net_worth(quotes):.2f}")
         print("Portfolio:")
         for ticker, shares in self.stocks.items():
-            price = get_price(ticker)
+            price = quotes.get(ticker)
             color = Style.RESET_ALL
             change_str = ""
             value_str = ""
-            if ticker in self.purchase_info and self.purchase_info[ticker]:
-                total_purchased = sum([p["shares"] for p in self.purchase_info[ticker]])
-                avg_purchase_price = sum([p["price"] * p["shares"] for p in self.purchase_info[ticker]]) / total_purchased if total_purchased else 0
+            position = self.positions.get(ticker)
+            if position is not None and price is not None:
+                avg_purchase_price = position.avg_price
                 change = ((price - avg_purchase_price) / avg_purchase_price * 100) if avg_purchase_price else 0
                 value = shares * price if price is not None else 0
                 if change > 0:
@@ -511,132 +1609,302 @@ class Portfolio:
                     color = Fore.RED
                 change_str = f" | Change: {color}{change:.2f}%{Style.RESET_ALL}"
                 value_str = f" | Value: {color}${value:.2f}{Style.RESET_ALL}"
-                print(f"  {color}{ticker}{Style.RESET_ALL}: {shares} shares{value_str}{change_str}")
-            else:
-                print(f"  {ticker}: {shares} shares | No purchase info")
+            age_str = ""
+            if ages is not None:
+                age_str = f" | {format_age(ages[ticker])}" if ticker in ages else " | price pending"
+            print(f"  {color}{ticker}{Style.RESET_ALL}: {shares} shares{value_str}{change_str}{age_str}")
 
-    def show_market_value(self):
+    @stats.timed("Portfolio.show_market_value")
+    def show_market_value(self, quotes=None, ages=None):
         total_value = 0.0
         print("\nCurrent Market Value of Portfolio:")
+        if quotes is None:
+            quotes = get_prices(self.stocks)
         for ticker, shares in self.stocks.items():
-            price = get_price(ticker)
+            price = quotes.get(ticker)
             if price is not None:
                 value = shares * price
                 total_value += value
-                print(f"  {ticker}: {shares} shares x ${price:.2f} = ${value:.2f}")
+                age_str = f" ({format_age(ages[ticker])})" if ages is not None else ""
+                print(f"  {ticker}: {shares} shares x ${price:.2f} = ${value:.2f}{age_str}")
+            elif ages is not None:
+                print(f"  {ticker}: {shares} shares (price pending)")
             else:
                 print(f"  {ticker}: {shares} shares (price unavailable)")
         print(f"Total Market Value of Holdings: ${total_value:.2f}\n")
-    def save(self, filename="portfolio_save.json"):
-        data = {
-            "balance": self.balance,
-            "stocks": self.stocks
-        }
-        with open(filename, "w") as f:
-            json.dump(data, f)
+
+class Order:
+    def __init__(self, owner, ticker, side, kind, shares, limit=None, stop=None):
+        if side not in ("buy", "sell"):
+            raise ValueError(f"side must be 'buy' or 'sell', not {side!r}")
+        if kind not in ORDER_TYPES:
+            raise ValueError(f"order type must be one of {ORDER_TYPES}, not {kind!r}")
+        if kind != "stop" and limit is None:
+            raise ValueError(f"a {kind} order needs a limit price")
+        if kind != "limit" and stop is None:
+            raise ValueError(f"a {kind} order needs a stop price")
+        self.id = None
+        self.owner = owner  # Portfolio the fill is booked to
+        self.ticker = ticker
+        self.side = side
+        self.kind = kind
+        self.shares = shares
+        self.limit = limit
+        self.stop = stop
+        self.status = "open"  # open, filled, rejected or cancelled
+
+    def __repr__(self):
+        levels = " ".join(f"{name} ${level:.2f}" for name, level in (("stop", self.stop), ("limit", self.limit)) if level is not None)
+        return f"#{self.id} {self.side} {self.shares} {self.ticker} {levels} ({self.status})"
+
+    def to_dict(self):
+        return {"ticker": self.ticker, "side": self.side, "kind": self.kind,
+                "shares": self.shares, "limit": self.limit, "stop": self.stop}
 
     @staticmethod
-    def load(filename="portfolio_save.json"):
-        if not os.path.exists(filename):
-            return Portfolio(START_BALANCE)
-        with open(filename, "r") as f:
-            data = json.load(f)
-        portfolio = Portfolio(data.get("balance", START_BALANCE))
-        portfolio.stocks = data.get("stocks", {})
-        return portfolio
-    def __init__(self, balance):
-        self.balance = balance
-        self.stocks = {}  # ticker: shares
+    def from_dict(data, owner):
+        return Order(owner, data["ticker"], data["side"], data["kind"], data["shares"], data.get("limit"), data.get("stop"))
 
-    def buy(self, ticker, shares, price):
-        cost = shares * price
-        if cost > self.balance:
-            print("Not enough balance!")
-            return False
-        self.balance -= cost
-        self.stocks[ticker] = self.stocks.get(ticker, 0) + shares
-        print(f"Bought {shares} shares of {ticker} at ${price:.2f} each.")
-        return True
+# Resting orders for any number of portfolios. Each ticker keeps four heaps,
+# stops and limits per side, keyed so the order nearest to triggering is on
+# top; every heap fires when its top key <= sign * price. A quote therefore
+# only pops the orders it actually fills, O(log n) each. Cancelled orders stay
+# in their heap and are skipped when they surface.
+class OrderBook:
+    # (side, stage): sign applied to the trigger level
+    SIGNS = {("buy", "limit"): -1, ("sell", "limit"): 1, ("buy", "stop"): 1, ("sell", "stop"): -1}
 
-    def sell(self, ticker, shares, price):
-        if self.stocks.get(ticker, 0) < shares:
-            print("Not enough shares!")
+    def __init__(self):
+        self.heaps = {}  # ticker: {(side, stage): [(key, seq, order)]}
+        self.orders = {}  # order id: open Order
+        self.ids = itertools.count(1)
+        self.seq = itertools.count()
+        self.matched = {}  # ticker: last price matched, to skip unchanged quotes
+        self.cancelled = 0  # cancelled orders still sitting in a heap
+
+    def __len__(self):
+        return len(self.orders)
+
+    def tickers(self):
+        return list(self.heaps)
+
+    def _push(self, order, stage):
+        level = order.limit if stage == "limit" else order.stop
+        key = self.SIGNS[order.side, stage] * level
+        heaps = self.heaps.setdefault(order.ticker, {})
+        heapq.heappush(heaps.setdefault((order.side, stage), []), (key, next(self.seq), order))
+        self.matched.pop(order.ticker, None)
+
+    def _add(self, order):
+        order.id = next(self.ids)
+        order.status = "open"
+        self.orders[order.id] = order
+        order.owner.open_orders[order.id] = order
+        self._push(order, "limit" if order.kind == "limit" else "stop")
+        return order
+
+    def submit(self, portfolio, ticker, side, kind, shares, limit=None, stop=None):
+        return self._add(Order(portfolio, ticker, side, kind, shares, limit, stop))
+
+    # Put a loaded portfolio's saved orders back on the book under new ids
+    def restore(self, portfolio):
+        saved = list(portfolio.open_orders.values())
+        portfolio.open_orders = {}
+        for order in saved:
+            self._add(order)
+
+    def cancel(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if order is None:
             return False
-        self.stocks[ticker] -= shares
-        self.balance += shares * price
-        print(f"Sold {shares} shares of {ticker} at ${price:.2f} each.")
+        order.status = "cancelled"
+        order.owner.open_orders.pop(order_id, None)
+        self.cancelled += 1
+        if self.cancelled > len(self.orders):
+            self._compact()
         return True
 
-    def get_net_worth(self):
-        total_value = self.balance
-        for ticker, shares in self.stocks.items():
-            price = get_price(ticker)
-            if price is not None:
-                total_value += shares * price
-        return total_value
+    # Rebuild the heaps without cancelled entries once they outnumber open orders
+    def _compact(self):
+        for heaps in self.heaps.values():
+            for stage, heap in heaps.items():
+                heaps[stage] = [entry for entry in heap if entry[2].status == "open"]
+                heapq.heapify(heaps[stage])
+        self.heaps = {ticker: heaps for ticker, heaps in self.heaps.items() if any(heaps.values())}
+        self.cancelled = 0
 
-    def show(self):
-        print(f"Balance: ${self.balance:.2f}")
-        print(f"Net Worth: ${self.get_net_worth():.2f}")
-        print("Portfolio:")
-        for ticker, shares in self.stocks.items():
-            price = get_price(ticker)
-            color = Style.RESET_ALL
-            change_str = ""
-            value_str = ""
-            if ticker in self.purchase_info and self.purchase_info[ticker]:
-                total_purchased = sum([p["shares"] for p in self.purchase_info[ticker]])
-                avg_purchase_price = sum([p["price"] * p["shares"] for p in self.purchase_info[ticker]]) / total_purchased if total_purchased else 0
-                change = ((price - avg_purchase_price) / avg_purchase_price * 100) if avg_purchase_price else 0
-                value = shares * price if price is not None else 0
-                if change > 0:
-                    color = Fore.GREEN
-                elif change < 0:
-                    color = Fore.RED
-                change_str = f" | Change: {color}{change:.2f}%{Style.RESET_ALL}"
-                value_str = f" | Value: {color}${value:.2f}{Style.RESET_ALL}"
-            print(f"  {color}{ticker}{Style.RESET_ALL}: {shares} shares{value_str}{change_str}")
+    def _close(self, order, status):
+        order.status = status
+        self.orders.pop(order.id, None)
+        order.owner.open_orders.pop(order.id, None)
 
-    def show_market_value(self):
-        total_value = 0.0
-        print("\nCurrent Market Value of Portfolio:")
-        for ticker, shares in self.stocks.items():
-            price = get_price(ticker)
-            if price is not None:
-                value = shares * price
-                total_value += value
-                print(f"  {ticker}: {shares} shares x ${price:.2f} = ${value:.2f}")
-            else:
-                print(f"  {ticker}: {shares} shares (price unavailable)")
-        print(f"Total Market Value of Holdings: ${total_value:.2f}\n")
+    # Pop every open order on this heap the price has crossed
+    def _triggered(self, heaps, side, stage, price):
+        heap = heaps.get((side, stage))
+        bound = self.SIGNS[side, stage] * price
+        while heap and heap[0][0] <= bound:
+            order = heapq.heappop(heap)[2]
+            if order.status == "open":
+                yield order
 
+    def _fill(self, order, price):
+        trade = order.owner.buy if order.side == "buy" else order.owner.sell
+        filled = trade(order.ticker, order.shares, price)
+        self._close(order, "filled" if filled else "rejected")
+        return filled
 
-def get_price(ticker):
+    # Match resting orders against a batch of quotes (ticker: price). Stops that
+    # trigger fill at the quote, or join the limit heap if they are stop-limits;
+    # crossed limits fill at the quote. Returns [(order, price)] for every fill.
+    @stats.timed("OrderBook.match")
+    def match(self, quotes):
+        fills = []
+        for ticker, price in quotes.items():
+            heaps = self.heaps.get(ticker)
+            if heaps is None or price is None or self.matched.get(ticker) == price:
+                continue
+            for side in ("buy", "sell"):
+                for order in list(self._triggered(heaps, side, "stop", price)):
+                    if order.kind == "stop_limit":
+                        self._push(order, "limit")
+                    elif self._fill(order, price):
+                        fills.append((order, price))
+            self.matched[ticker] = price
+            for side in ("buy", "sell"):
+                for order in list(self._triggered(heaps, side, "limit", price)):
+                    if self._fill(order, price):
+                        fills.append((order, price))
+            if not any(heaps.values()):
+                del self.heaps[ticker]
+                self.matched.pop(ticker, None)
+        return fills
+
+def place_order(book, portfolio):
+    ticker = input("Enter stock ticker (e.g., AAPL): ").strip().upper()
+    side = input("Buy or sell? ").strip().lower()
+    kind = input(f"Order type ({', '.join(ORDER_TYPES)})? ").strip().lower()
     try:
-        stock = yf.Ticker(ticker)
-        price = stock.history(period="1d")["Close"]
-        if price.empty:
-            print(f"Error: Ticker '{ticker}' not found or no price available.")
-            return None
-        return float(price.iloc[-1])
-    except Exception as e:
-        print(f"Error fetching price for {ticker}: {e}")
+        shares = int(input("How many shares? "))
+        stop = float(input("Stop price: $")) if kind in ("stop", "stop_limit") else None
+        limit = float(input("Limit price: $")) if kind in ("limit", "stop_limit") else None
+        order = book.submit(portfolio, ticker, side, kind, shares, limit, stop)
+    except ValueError as e:
+        print(f"Invalid order: {e}")
+        return None
+    print(f"Placed order {order}")
+    return order
+
+def show_orders(book, portfolio):
+    if not portfolio.open_orders:
+        print("No open orders.")
+        return
+    for order in portfolio.open_orders.values():
+        print(f"  {order}")
+    choice = input("Order number to cancel (blank to keep all): ").strip().lstrip("#")
+    if choice:
+        if choice.isdigit() and int(choice) in portfolio.open_orders and book.cancel(int(choice)):
+            print(f"Cancelled order #{choice}.")
+        else:
+            print(f"No open order #{choice}.")
+
+# Trades for Portfolio.execute_batch from a CSV file with action,ticker,shares[,price]
+# columns, or from JSON lines with the same keys.
+def load_orders(path):
+    with open(path, newline="") as f:
+        if os.path.splitext(path)[1].lower() == ".csv":
+            return [{key.strip().lower(): value for key, value in row.items() if key} for row in csv.DictReader(f)]
+        return [json.loads(line) for line in f if line.strip()]
+
+# Live P&L for the held tickers while price ticks stream in. Each tick adjusts
+# the holdings total by shares * (new - old) instead of revaluing everything,
+# and the screen is redrawn at most `fps` times per second.
+class WatchSession:
+    def __init__(self, portfolio, quotes):
+        self.portfolio = portfolio
+        self.shares = {ticker: shares for ticker, shares in portfolio.stocks.items() if shares and quotes.get(ticker) is not None}
+        self.start_prices = {ticker: quotes[ticker] for ticker in self.shares}
+        self.prices = dict(self.start_prices)
+        self.holdings_value = sum(shares * self.prices[ticker] for ticker, shares in self.shares.items())
+        self.start_value = self.holdings_value
+        self.ticks = 0
+
+    def apply(self, ticks):
+        shares = self.shares
+        prices = self.prices
+        value = self.holdings_value
+        for ticker, price in ticks:
+            held = shares.get(ticker)
+            if held is not None:
+                value += held * (price - prices[ticker])
+                prices[ticker] = price
+        self.holdings_value = value
+        self.ticks += len(ticks)
+
+    @property
+    def net_worth(self):
+        return self.portfolio.balance + self.holdings_value
+
+    def render(self, elapsed):
+        lines = ["\033[H\033[J--- Watch Mode (Ctrl+C to stop) ---"]
+        rate = self.ticks / elapsed if elapsed else 0
+        change = self.holdings_value - self.start_value
+        color = Fore.GREEN if change > 0 else (Fore.RED if change < 0 else Style.RESET_ALL)
+        lines.append(f"Ticks: {self.ticks} ({rate:.0f}/s) | Net Worth: ${self.net_worth:.2f} | Session: {color}${change:+.2f}{Style.RESET_ALL}")
+        for ticker, shares in self.shares.items():
+            price = self.prices[ticker]
+            start = self.start_prices[ticker]
+            pct = (price - start) / start * 100 if start else 0
+            color = Fore.GREEN if pct > 0 else (Fore.RED if pct < 0 else Style.RESET_ALL)
+            lines.append(f"  {ticker}: {shares} x ${price:.2f} = ${shares * price:.2f} | {color}{pct:+.2f}%{Style.RESET_ALL}")
+        print("\n".join(lines), flush=True)
+
+def watch(portfolio, duration=None, fps=WATCH_FPS):
+    tickers = [ticker for ticker, shares in portfolio.stocks.items() if shares]
+    if not tickers:
+        print("No holdings to watch.")
         return None
+    session = WatchSession(portfolio, get_prices(tickers))
+    if not session.shares:
+        print("No prices available for your holdings.")
+        return None
+    stop = threading.Event()
+    frame = 1 / fps
+    start = time.perf_counter()
+    next_frame = start
+    try:
+        for ticks in market_data.stream(list(session.shares), stop):
+            session.apply(ticks)
+            now = time.perf_counter()
+            if now >= next_frame:
+                session.render(now - start)
+                next_frame = now + frame
+            if duration is not None and now - start >= duration:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+    session.render(time.perf_counter() - start)
+    print("Stopped watching.\n")
+    return session
 
-def main():
+def main(save_file="portfolio_save.json", save_format=None, refresh_interval=REFRESH_INTERVAL):
     print("Welcome to the Stock Trading Game!")
     while True:
         choice = input("Type 'new' to start a new game or 'continue' to load your previous game: ").strip().lower()
         if choice == "new":
             portfolio = Portfolio(START_BALANCE)
+            portfolio.save_format = save_format
+            portfolio.attach_journal(save_file)
+            portfolio.save(save_file)
             print("Starting a new game!")
             break
         elif choice == "continue":
-            portfolio = Portfolio.load()
+            portfolio = Portfolio.load(save_file)
+            portfolio.save_format = save_format
             print("Continuing your previous game!")
-            # Show performance summary for owned stocks
             print("\n--- Portfolio Performance Since Last Save ---")
-            change, percent = portfolio.get_net_worth_change_since_last_save()
+            change, percent = portfolio.get_net_worth_change_since_last_save(save_file)
             if change is not None:
                 if change > 0:
                     color = Fore.GREEN
@@ -644,30 +1912,89 @@ def main():
                     color = Fore.RED
                 else:
                     color = Style.RESET_ALL
-                print(f"Net Worth Change: {color}${change:.2f} ({percent:.2f}%){Style.RESET_ALL}")
-            perf = portfolio.get_stock_performance_since_last_save()
+                print(f"Net Worth Change Since Last Check-in: {color}${change:.2f} ({percent:.2f}%){Style.RESET_ALL}")
+            perf = portfolio.get_stock_performance_since_last_save(save_file)
             if perf:
                 for ticker, summary in perf.items():
                     print(f"{ticker}: {summary}")
             else:
                 print("No stocks owned or no previous save data.")
+            print("\n--- Portfolio Change Since Purchase ---")
+            purchase_summary = portfolio.get_portfolio_change_since_purchase()
+            for ticker, info in purchase_summary.items():
+                if isinstance(info, dict):
+                    c = Fore.GREEN if info["change"] > 0 else (Fore.RED if info["change"] < 0 else Style.RESET_ALL)
+                    print(f"{ticker}: {info['shares']} shares | Avg Purchase: ${info['avg_purchase_price']:.2f} | Now: ${info['current_price']:.2f} | Change: {c}{info['change']:.2f}%{Style.RESET_ALL}")
+                else:
+                    print(f"{ticker}: {info}")
             print("--------------------------------------------\n")
+            show_graph = input("Would you like to see a graph of your portfolio value over time? (yes/no): ").strip().lower()
+            if show_graph == "yes":
+                plot_value_history(portfolio.value_history())
             break
         else:
             print("Invalid choice. Please type 'new' or 'continue'.")
 
+    book = OrderBook()
+    book.restore(portfolio)
+    screen = None
+    refresher = None
+    if refresh_interval:
+        refresher = QuoteRefresher(lambda: list(portfolio.stocks) + DEFAULT_STOCKS + book.tickers(), refresh_interval)
+        refresher.start()
+
     while True:
-        portfolio.show()
-        portfolio.show_market_value()
-        print("Type 'market' to view available stocks.")
+        if book:
+            if refresher is not None:
+                order_quotes, _ = quote_snapshot(book.tickers())
+            else:
+                order_quotes = get_prices(book.tickers(), quiet=True)
+            for order, price in book.match(order_quotes):
+                print(f"Filled order {order} at ${price:.2f}")
+        with stats.render():
+            if refresher is not None:
+                quotes, ages = quote_snapshot(portfolio.stocks)
+                portfolio.show(quotes, ages)
+                portfolio.show_market_value(quotes, ages)
+            else:
+                portfolio.show()
+                portfolio.show_market_value()
+        print("Type 'market' to view available stocks, 'screen' to rank the whole universe, 'watch' to follow live prices or 'risk' for risk figures.")
+        print("Type 'order' to place a limit/stop order or 'orders' to review and cancel them.")
         action = input("Buy, Sell, Market, or Quit? ").strip().lower()
         if action == "quit":
-            portfolio.save()
+            portfolio.save(save_file)
             print("Progress saved. Goodbye!")
+            if refresher is not None:
+                refresher.stop()
+            if stats.enabled:
+                print(stats.summary())
             break
         elif action == "market":
             show_market_menu()
             continue
+        elif action == "stats":
+            print(stats.summary())
+            continue
+        elif action == "watch":
+            watch(portfolio)
+            continue
+        elif action == "risk":
+            import risk
+            risk.show_risk_report(risk.risk_report(portfolio))
+            continue
+        elif action == "screen":
+            import screener
+            if screen is None:
+                screen = screener.Screener.load(screener.load_universe() + list(portfolio.stocks))
+            screener.run_screen(screen)
+            continue
+        elif action == "order":
+            place_order(book, portfolio)
+            continue
+        elif action == "orders":
+            show_orders(book, portfolio)
+            continue
         ticker = input("Enter stock ticker (e.g., AAPL): ").strip().upper()
         if action == "buy":
             DoubleCheckValue = input("Would you like to see graphs before you buy (yes/no)? ")
@@ -696,7 +2023,46 @@ def main():
         else:
             print("Invalid action.")
         print()
-        time.sleep(1)  # Small delay for realism
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    # risk / screener import this file as LiveFinanceGame; hand them the running
+    # module so they share its provider and caches instead of a fresh copy
+    sys.modules.setdefault("LiveFinanceGame", sys.modules[__name__])
+    parser = argparse.ArgumentParser(description="Stock Trading Game")
+    parser.add_argument("--save-file", default="portfolio_save.json", help="portfolio save file (.json or .pfb)")
+    parser.add_argument("--save-format", choices=sorted(SAVE_FORMATS), help="override the format picked from the extension")
+    parser.add_argument("--batch", metavar="FILE", help="execute the trades in a CSV or JSONL file against the save file and exit")
+    parser.add_argument("--migrate", nargs=2, metavar=("SOURCE", "DEST"), help="convert a save file to another format and exit")
+    parser.add_argument("--provider", choices=sorted(PROVIDERS), default="yfinance", help="market data source")
+    parser.add_argument("--replay-dir", default=HISTORY_DIR, help="recorded bars for --provider replay")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for --provider synthetic")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per request for offline providers")
+    parser.add_argument("--refresh-interval", type=float, default=REFRESH_INTERVAL, help="seconds between background quote refreshes (0 to fetch on every redraw)")
+    parser.add_argument("--plot-dir", help="write charts to this directory (headless) instead of opening windows")
+    parser.add_argument("--plot-format", choices=["png", "svg"], default=PLOT_FORMAT)
+    parser.add_argument("--stats", action="store_true", help="collect timing and network stats (type 'stats' in game to view)")
+    args = parser.parse_args()
+    if args.stats:
+        stats.enabled = True
+    if args.plot_dir:
+        PLOT_DIR, PLOT_FORMAT = args.plot_dir, args.plot_format
+        plt.switch_backend("Agg")
+    if args.provider == "replay":
+        set_market_data(ReplayProvider(args.replay_dir, latency=args.latency))
+    elif args.provider == "synthetic":
+        set_market_data(SyntheticProvider(args.seed, latency=args.latency))
+    if args.migrate:
+        migrate_save(*args.migrate, fmt=args.save_format)
+        print(f"Migrated {args.migrate[0]} to {args.migrate[1]}.")
+    elif args.batch:
+        portfolio = Portfolio.load(args.save_file)
+        portfolio.save_format = args.save_format
+        try:
+            trades = portfolio.execute_batch(load_orders(args.batch))
+            print(f"Executed {len(trades)} trades. Balance: ${portfolio.balance:.2f}")
+        except ValueError as e:
+            print(e)
+        portfolio.journal.close()
+    else:
+        main(args.save_file, args.save_format, args.refresh_interval)
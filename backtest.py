@@ -0,0 +1,191 @@
+# Historical backtests over the stored 2-year histories.
+#
+# Strategies are evaluated as array operations across every ticker at once,
+# and parameter grids are spread over a process pool. replay() then drives a
+# real Portfolio through the chosen variant day by day with buy/sell at the
+# historical closes.
+#
+#   python backtest.py --fast 2:60 --slow 10:260:5 --top 10
+#   python backtest.py --provider synthetic --replay-best
+import argparse
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import LiveFinanceGame as game
+
+
+# Steps through the shared date axis one trading day at a time
+class SimulationClock:
+    def __init__(self, dates, start=0):
+        self.dates = dates
+        self.index = start
+
+    @property
+    def now(self):
+        return self.dates[self.index]
+
+    def step(self):
+        self.index += 1
+        return self.index < len(self.dates)
+
+    def __iter__(self):
+        while self.index < len(self.dates):
+            yield self.index, str(self.now)
+            self.index += 1
+
+
+# Simple moving averages for every window in one pass over a cumulative sum;
+# NaN until a ticker has `window` bars.
+def moving_averages(closes, windows):
+    valid = ~np.isnan(closes)
+    sums = np.vstack([np.zeros((1, closes.shape[1])), np.cumsum(np.where(valid, closes, 0.0), axis=0)])
+    counts = np.vstack([np.zeros((1, closes.shape[1])), np.cumsum(valid, axis=0)])
+    averages = {}
+    for window in windows:
+        sma = np.full(closes.shape, np.nan)
+        if window <= len(closes):
+            total = sums[window:] - sums[:-window]
+            full = (counts[window:] - counts[:-window]) == window
+            sma[window - 1:] = np.where(full, total / window, np.nan)
+        averages[window] = sma
+    return averages
+
+
+# Which tickers the fast/slow crossover holds on each day. Signals from day t
+# are acted on at day t's close, so they earn day t+1's return.
+def crossover_holdings(averages, fast, slow):
+    signal = averages[fast] > averages[slow]
+    held = np.zeros_like(signal)
+    held[1:] = signal[:-1]
+    return held
+
+
+def equity_curve(returns, held, cash=game.START_BALANCE):
+    counts = held.sum(axis=1, keepdims=True)
+    weights = np.divide(held, counts, out=np.zeros(held.shape), where=counts > 0)
+    return cash * np.cumprod(1 + (weights * returns).sum(axis=1))
+
+
+def summarize(equity):
+    daily = np.diff(equity) / equity[:-1]
+    peak = np.maximum.accumulate(equity)
+    std = daily.std()
+    return {
+        "final_equity": float(equity[-1]),
+        "total_return": float(equity[-1] / equity[0] - 1) * 100,
+        "max_drawdown": float((equity / peak - 1).min()) * 100,
+        "sharpe": float(daily.mean() / std * np.sqrt(game.TRADING_DAYS)) if std else 0.0,
+    }
+
+
+_worker = {}
+
+
+def _init_worker(closes, windows):
+    _worker["returns"] = game.daily_returns(closes)
+    _worker["averages"] = moving_averages(closes, windows)
+
+
+def _run_chunk(variants):
+    results = []
+    for fast, slow in variants:
+        held = crossover_holdings(_worker["averages"], fast, slow)
+        results.append({"fast": fast, "slow": slow, **summarize(equity_curve(_worker["returns"], held))})
+    return results
+
+
+# Evaluate every (fast, slow) variant; processes=1 runs in this process
+def run_grid(closes, variants, processes=None, chunk_size=200):
+    variants = [(fast, slow) for fast, slow in variants if fast < slow]
+    windows = sorted({window for variant in variants for window in variant})
+    chunks = [variants[i:i + chunk_size] for i in range(0, len(variants), chunk_size)]
+    if processes == 1:
+        _init_worker(closes, windows)
+        return [row for chunk in chunks for row in _run_chunk(chunk)]
+    with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(closes, windows)) as pool:
+        return [row for rows in pool.map(_run_chunk, chunks) for row in rows]
+
+
+# Drive a Portfolio through one variant at historical closes: sell a ticker when
+# its signal turns off, buy it with an equal share of the cash when it turns on.
+# Returns the daily equity curve (balance + holdings at that day's close).
+def replay(portfolio, tickers, dates, closes, fast, slow, quiet=True):
+    held = crossover_holdings(moving_averages(closes, [fast, slow]), fast, slow)
+    columns = {ticker: column for column, ticker in enumerate(tickers)}
+    equity = np.empty(len(dates))
+    output = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    with output:
+        for t, date in SimulationClock(dates):
+            prices = closes[t]
+            signal = held[min(t + 1, len(dates) - 1)]  # decided at today's close
+            for column in np.flatnonzero(~signal):
+                ticker = tickers[column]
+                shares = portfolio.stocks.get(ticker, 0)
+                if shares and not np.isnan(prices[column]):
+                    portfolio.sell(ticker, shares, float(prices[column]), date=date)
+            entering = [c for c in np.flatnonzero(signal)
+                        if not portfolio.stocks.get(tickers[c]) and not np.isnan(prices[c])]
+            budget = portfolio.balance / len(entering) if entering else 0
+            for column in entering:
+                shares = int(budget // prices[column])
+                if shares:
+                    portfolio.buy(tickers[column], shares, float(prices[column]), date=date)
+            holdings = sum(shares * prices[columns[ticker]]
+                           for ticker, shares in portfolio.stocks.items() if shares and ticker in columns)
+            equity[t] = portfolio.balance + holdings
+    return equity
+
+
+def parse_range(text):
+    parts = [int(part) for part in text.split(":")]
+    if len(parts) == 1:
+        return [parts[0]]
+    return list(range(*parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest moving-average crossover variants")
+    parser.add_argument("--tickers", nargs="+", default=game.DEFAULT_STOCKS)
+    parser.add_argument("--fast", default="2:60", help="fast windows as N or start:stop[:step]")
+    parser.add_argument("--slow", default="10:260:5", help="slow windows as N or start:stop[:step]")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--replay-best", action="store_true", help="replay the best variant through a Portfolio")
+    parser.add_argument("--provider", choices=sorted(game.PROVIDERS), default="yfinance")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.provider == "synthetic":
+        game.set_market_data(game.SyntheticProvider(args.seed))
+    elif args.provider == "replay":
+        game.set_market_data(game.ReplayProvider())
+
+    dates, closes = game.get_price_matrix(args.tickers)
+    if not len(dates):
+        print("No historical data available.")
+        return
+    variants = [(fast, slow) for fast in parse_range(args.fast) for slow in parse_range(args.slow)]
+    start = time.perf_counter()
+    results = run_grid(closes, variants, args.processes)
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated {len(results)} variants over {len(args.tickers)} tickers x {len(dates)} days in {elapsed:.2f}s")
+    results.sort(key=lambda row: row["sharpe"], reverse=True)
+    for row in results[:args.top]:
+        print(f"  SMA {row['fast']:>3}/{row['slow']:<3} | Return: {row['total_return']:8.2f}% | "
+              f"Max DD: {row['max_drawdown']:7.2f}% | Sharpe: {row['sharpe']:5.2f}")
+
+    if args.replay_best and results:
+        best = results[0]
+        portfolio = game.Portfolio(game.START_BALANCE)
+        equity = replay(portfolio, list(args.tickers), dates, closes, best["fast"], best["slow"])
+        print(f"\nReplayed SMA {best['fast']}/{best['slow']} through a Portfolio: "
+              f"${equity[0]:.2f} -> ${equity[-1]:.2f}, {sum(len(p) for p in portfolio.purchase_info.values())} buys")
+
+
+if __name__ == "__main__":
+    main()
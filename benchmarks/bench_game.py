@@ -0,0 +1,169 @@
+# Headless benchmarks for the game loop and Portfolio operations.
+#
+# Runs everything against the offline SyntheticProvider, sweeping portfolio
+# size and history length, and writes latency percentiles plus peak traced
+# allocation per operation to a JSON file so runs can be compared across commits.
+#
+#   python benchmarks/bench_game.py
+#   python benchmarks/bench_game.py --tickers 10 100 --history-days 252 --output before.json
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import LiveFinanceGame as game
+
+MAIN_PROMPT = "Buy, Sell, Market, or Quit? "
+
+
+def make_portfolio(tickers):
+    portfolio = game.Portfolio(game.START_BALANCE * len(tickers))
+    for n, ticker in enumerate(tickers):
+        portfolio._apply_buy(ticker, 1 + n % 20, 50.0 + n % 100, "2024-01-02")
+    return portfolio
+
+
+# Feeds main() a fixed list of answers and timestamps every main-loop prompt,
+# so the gaps between prompts are the per-iteration latencies.
+class ScriptedInput:
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.prompt_times = []
+
+    def __call__(self, prompt=""):
+        if prompt == MAIN_PROMPT:
+            self.prompt_times.append(time.perf_counter())
+        return self.answers.pop(0)
+
+
+# Quotes are fetched on each redraw (no background refresher), so a cold cache
+# is actually paid for inside the timed iterations.
+def run_main(save_file, iterations):
+    script = ScriptedInput(["continue", "no"] + ["market", ""] * iterations + ["quit"])
+    original_input = builtins.input
+    builtins.input = script
+    try:
+        game.main(save_file, refresh_interval=0)
+    finally:
+        builtins.input = original_input
+    return np.diff(script.prompt_times)
+
+
+def time_calls(func, repeat, cold):
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            game.price_cache.clear()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return np.array(samples)
+
+
+def peak_allocation(func, cold):
+    if cold:
+        game.price_cache.clear()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(op, tickers, history_days, samples, peak):
+    ms = samples * 1000
+    return {
+        "op": op,
+        "tickers": tickers,
+        "history_days": history_days,
+        "samples": len(ms),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "peak_alloc_kb": None if peak is None else peak / 1024,
+    }
+
+
+def bench(size, history_days, repeat, cold, tmp):
+    game.set_market_data(game.SyntheticProvider(seed=0, days=history_days))
+    tickers = [f"T{n:05d}" for n in range(size)]
+    portfolio = make_portfolio(tickers)
+    json_file = os.path.join(tmp, f"bench_{size}.json")
+    binary_file = os.path.join(tmp, f"bench_{size}.pfb")
+    ops = {
+        # History readers: these are what the --history-days sweep changes
+        "performance": lambda: game.compute_performance(list(game.get_historical_prices_many(tickers).values())),
+        "value_history": portfolio.value_history,
+        "get_net_worth": portfolio.get_net_worth,
+        "show": portfolio.show,
+        "show_market_value": portfolio.show_market_value,
+        "save_json": lambda: portfolio.save(json_file),
+        "load_json": lambda: game.Portfolio.load(json_file, journal=False),
+        "save_binary": lambda: portfolio.save(binary_file),
+        "load_binary": lambda: game.Portfolio.load(binary_file, journal=False),
+    }
+    results = []
+    for op, func in ops.items():
+        samples = time_calls(func, repeat, cold)
+        results.append(summarize(op, size, history_days, samples, peak_allocation(func, cold)))
+    portfolio.save(json_file)
+    game.price_cache.clear()
+    results.append(summarize("main_iteration", size, history_days, run_main(json_file, repeat), None))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game loop and Portfolio operations")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--history-days", type=int, nargs="+", default=[252, 520])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--warm", action="store_true", help="keep the price cache between calls")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for history_days in args.history_days:
+            for size in args.tickers:
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    rows = bench(size, history_days, args.repeat, not args.warm, tmp)
+                for row in rows:
+                    print(f"{row['op']:>18} tickers={size:<6} days={history_days:<4} "
+                          f"p50={row['p50_ms']:9.2f}ms p99={row['p99_ms']:9.2f}ms")
+                results.extend(rows)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": args.repeat,
+        "cache": "warm" if args.warm else "cold",
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
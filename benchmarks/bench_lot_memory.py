@@ -0,0 +1,62 @@
+# Memory held by the purchase ledger: per-trade dicts vs slotted Lot records,
+# plus a JSON save/load round trip to check the records load back unchanged.
+#
+#   python benchmarks/bench_lot_memory.py
+#   python benchmarks/bench_lot_memory.py --lots 100000 1000000
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import LiveFinanceGame as game
+from bench_save_formats import make_snapshot
+
+
+# Bytes still allocated after build() returns, with its result kept alive
+def retained(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        return tracemalloc.get_traced_memory()[0], result
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark purchase ledger memory")
+    parser.add_argument("--lots", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'lots':>10} {'dicts (MB)':>11} {'Lot (MB)':>9} {'B/lot before':>13} {'B/lot after':>12} {'round trip (s)':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for lots in args.lots:
+            # The ledger as json.load used to hand it to Portfolio: one dict and date string per lot
+            text = json.dumps(make_snapshot(lots)["purchase_info"])
+            dict_bytes, data = retained(lambda: json.loads(text))
+            del data
+            # The ledger as Portfolio.load now builds it, parsed inside the measurement
+            # so each Lot's floats are counted rather than borrowed from a live dict
+            lot_bytes, ledger = retained(lambda: game._lots_from_dicts(json.loads(text)))
+            del text
+
+            portfolio = game.Portfolio(game.START_BALANCE)
+            portfolio.purchase_info = ledger
+            path = os.path.join(tmp, "lots.json")
+            start = time.perf_counter()
+            portfolio.save(path)
+            loaded = game.Portfolio.load(path, journal=False)
+            elapsed = time.perf_counter() - start
+            if loaded.purchase_info != ledger:
+                raise SystemExit(f"JSON round trip changed the ledger at {lots} lots")
+            print(f"{lots:>10} {dict_bytes / 1e6:>11.1f} {lot_bytes / 1e6:>9.1f} "
+                  f"{dict_bytes / lots:>13.0f} {lot_bytes / lots:>12.0f} {elapsed:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Compare snapshot save/load time and size for each save format.
+#
+#   python benchmarks/bench_save_formats.py
+#   python benchmarks/bench_save_formats.py --lots 10000 100000 --repeat 5
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import LiveFinanceGame as game
+
+
+# `lots` purchases, plus a sale of one share against every `sell_every`th of them
+def make_snapshot(lots, lots_per_ticker=100, sell_every=2):
+    purchase_info = {}
+    sales = {}
+    stocks = {}
+    for n in range(lots):
+        ticker = f"T{n // lots_per_ticker:05d}"
+        date = f"20{20 + n % 5}-{1 + n % 12:02d}-{1 + n % 28:02d}"
+        purchase_info.setdefault(ticker, []).append({"date": date, "price": 10.0 + (n % 997) / 7, "shares": 1 + n % 50})
+        stocks[ticker] = stocks.get(ticker, 0) + 1 + n % 50
+        if sell_every and n % sell_every == 0:
+            sales.setdefault(ticker, []).append({"date": date, "price": 11.0 + (n % 991) / 7, "shares": 1})
+            stocks[ticker] -= 1
+    return {"balance": game.START_BALANCE, "stocks": stocks, "purchase_info": purchase_info, "sales": sales}
+
+
+def best_of(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark save formats")
+    parser.add_argument("--lots", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'lots':>10} {'format':>7} {'save (s)':>9} {'load (s)':>9} {'size (MB)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for lots in args.lots:
+            data = make_snapshot(lots)
+            for fmt in game.SAVE_FORMATS:
+                path = os.path.join(tmp, f"bench.{fmt}")
+                save = best_of(args.repeat, lambda: game.write_save_file(path, data, fmt))
+                load = best_of(args.repeat, lambda: game.read_save_file(path))
+                size = os.path.getsize(path) / 1e6
+                print(f"{lots:>10} {fmt:>7} {save:>9.3f} {load:>9.3f} {size:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
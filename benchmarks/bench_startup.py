@@ -0,0 +1,69 @@
+# Cold-start budget check for LiveFinanceGame.
+#
+# Imports the module in fresh interpreters with -X importtime, reports the
+# median import time and the slowest imports, and exits non-zero if the median
+# is over budget or a lazily loaded dependency got imported at startup.
+#
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --runs 10 --budget-ms 250
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUDGET_MS = 300  # numpy (~100ms) is the only heavy import allowed at startup
+LAZY_MODULES = ("matplotlib", "yfinance", "pandas")
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile():
+    code = ("import sys; import LiveFinanceGame; "
+            f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, cwd=ROOT, check=True)
+    imports = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            imports[match.group(4)] = int(match.group(2)) / 1000  # cumulative ms
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return imports, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check LiveFinanceGame cold-start time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.runs):
+        imports, loaded = import_profile()
+        totals.append(imports["LiveFinanceGame"])
+    median = statistics.median(totals)
+
+    print(f"LiveFinanceGame import: median {median:.1f}ms over {args.runs} runs (budget {args.budget_ms:.0f}ms)")
+    slowest = sorted(((ms, name) for name, ms in imports.items() if name != "LiveFinanceGame"), reverse=True)
+    for ms, name in slowest[:args.top]:
+        print(f"  {ms:8.1f}ms  {name}")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(loaded)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"FAIL: {median:.1f}ms is over the {args.budget_ms:.0f}ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+# Multi-player server mode: one asyncio process hosting many Portfolios behind
+# a small HTTP/JSON API.
+#
+# Every player shares LiveFinanceGame's price cache. Quote requests go through
+# one QuoteScheduler, which merges all tickers asked for within a short window
+# into one batched fetch and lets concurrent requests for the same ticker wait
+# on the same result, so N players holding AAPL cause one fetch, not N. Trades
+# mark a player dirty; a background task writes dirty saves in batches. Limit
+# and stop orders from every player rest in one shared OrderBook that is
+# matched against fresh quotes every MATCH_INTERVAL.
+#
+#   python game_server.py --port 8765
+#   curl -X POST localhost:8765/players/alice/buy -d '{"ticker": "AAPL", "shares": 3}'
+#   curl localhost:8765/players/alice
+#   curl -X POST localhost:8765/players/alice/orders -d '{"ticker": "AAPL", "side": "buy", "type": "limit", "shares": 3, "limit": 180}'
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import LiveFinanceGame as game
+
+BATCH_WINDOW = 0.02  # seconds quote requests are collected before one batched fetch
+SAVE_INTERVAL = 5  # seconds between background flushes of changed portfolios
+MATCH_INTERVAL = 1  # seconds between order book matching passes
+DATA_DIR = "players"
+MAX_BODY = 64 * 1024
+
+PLAYER_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class QuoteScheduler:
+    def __init__(self, window=BATCH_WINDOW):
+        self.window = window
+        self.in_flight = {}  # ticker: Future shared by everyone waiting on it
+        self.queued = set()
+        self.flush_handle = None
+        self.fetches = 0
+        self.requested = 0
+
+    async def get(self, tickers):
+        loop = asyncio.get_running_loop()
+        quotes, waiting = {}, {}
+        for ticker in dict.fromkeys(tickers):
+            self.requested += 1
+            cached = game.price_cache.get(("price", ticker))
+            if cached is not None:
+                quotes[ticker] = cached
+                continue
+            future = self.in_flight.get(ticker)
+            if future is None:
+                future = self.in_flight[ticker] = loop.create_future()
+                self.queued.add(ticker)
+            waiting[ticker] = future
+        if self.queued and self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.window, lambda: asyncio.ensure_future(self._flush()))
+        for ticker, future in waiting.items():
+            quotes[ticker] = await future
+        return quotes
+
+    async def _flush(self):
+        self.flush_handle = None
+        batch, self.queued = sorted(self.queued), set()
+        if not batch:
+            return
+        self.fetches += 1
+        loop = asyncio.get_running_loop()
+        try:
+            quotes = await loop.run_in_executor(None, lambda: game.get_prices(batch, quiet=True))
+        except Exception:
+            quotes = {}
+        for ticker in batch:
+            future = self.in_flight.pop(ticker, None)
+            if future is not None and not future.done():
+                future.set_result(quotes.get(ticker))
+
+
+class PlayerRegistry:
+    def __init__(self, directory=DATA_DIR, save_format=None, book=None):
+        self.directory = directory
+        self.save_format = save_format
+        self.book = book if book is not None else game.OrderBook()
+        self.players = {}
+        self.owners = {}  # id(portfolio): player id, to mark order fills dirty
+        self.dirty = set()
+        self.writing = None  # the executor future of the save in progress
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, player_id):
+        extension = ".pfb" if self.save_format == "binary" else ".json"
+        return os.path.join(self.directory, player_id + extension)
+
+    def get(self, player_id):
+        portfolio = self.players.get(player_id)
+        if portfolio is None:
+            portfolio = game.Portfolio.load(self.path(player_id), journal=False)
+            portfolio.save_format = self.save_format
+            self.players[player_id] = portfolio
+            self.owners[id(portfolio)] = player_id
+            self.book.restore(portfolio)
+        return portfolio
+
+    def mark_dirty(self, portfolio):
+        self.dirty.add(self.owners[id(portfolio)])
+
+    # Snapshots are taken on the event loop thread, where trades happen, so no
+    # portfolio changes while it is copied; only the file writes leave the loop.
+    def snapshots(self):
+        dirty, self.dirty = self.dirty, set()
+        return {player_id: self.players[player_id].snapshot() for player_id in dirty}
+
+    # Returns the players whose save failed, for the caller to mark dirty again
+    def write(self, snapshots):
+        failed = []
+        for player_id, data in snapshots.items():
+            try:
+                game.write_save_file(self.path(player_id), data, self.save_format)
+            except Exception as e:
+                print(f"Error saving player {player_id}: {e}")
+                failed.append(player_id)
+        return failed
+
+    def flush(self):
+        snapshots = self.snapshots()
+        self.dirty.update(self.write(snapshots))
+        return len(snapshots)
+
+    async def save_loop(self, interval=SAVE_INTERVAL):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            if self.dirty:
+                # Trades arriving during the write mark their player dirty again
+                snapshots = self.snapshots()
+                self.writing = loop.run_in_executor(None, self.write, snapshots)
+                # Shielded so shutdown can cancel the loop and still wait for the write
+                self.dirty.update(await asyncio.shield(self.writing))
+
+    async def match_loop(self, scheduler, interval=MATCH_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            if not self.book:
+                continue
+            quotes = await scheduler.get(self.book.tickers())
+            with contextlib.redirect_stdout(io.StringIO()):
+                fills = self.book.match(quotes)
+            for order, _ in fills:
+                self.mark_dirty(order.owner)
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class GameServer:
+    def __init__(self, registry, scheduler):
+        self.registry = registry
+        self.scheduler = scheduler
+        self.started = time.time()
+
+    async def handle(self, reader, writer):
+        try:
+            status, body = await self.respond(reader)
+        except HttpError as e:
+            status, body = e.status, {"error": str(e)}
+        except Exception as e:
+            status, body = 500, {"error": str(e)}
+        payload = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode() + payload
+        )
+        with contextlib.suppress(ConnectionError):
+            await writer.drain()
+        writer.close()
+
+    async def respond(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) < 2:
+            raise HttpError(400, "malformed request")
+        method, target = request_line[0], request_line[1]
+        length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.lower() == "content-length":
+                try:
+                    length = int(value)
+                except ValueError:
+                    raise HttpError(400, f"bad Content-Length {value.strip()!r}")
+                if length < 0:
+                    raise HttpError(400, f"bad Content-Length {length}")
+        if length > MAX_BODY:
+            raise HttpError(413, "request body too large")
+        try:
+            body = json.loads(await reader.readexactly(length)) if length else {}
+        except asyncio.IncompleteReadError:
+            raise HttpError(400, "request body shorter than Content-Length")
+        except ValueError as e:
+            raise HttpError(400, f"request body is not valid JSON: {e}")
+        if not isinstance(body, dict):
+            raise HttpError(400, "request body must be a JSON object")
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        return await self.route(method, parts, parse_qs(url.query), body)
+
+    async def route(self, method, parts, query, body):
+        if parts == ["quotes"] and method == "GET":
+            tickers = [t.strip().upper() for t in query.get("tickers", [""])[0].split(",") if t.strip()]
+            return 200, await self.scheduler.get(tickers)
+        if parts == ["stats"] and method == "GET":
+            return 200, {
+                "players_loaded": len(self.registry.players),
+                "dirty": len(self.registry.dirty),
+                "open_orders": len(self.registry.book),
+                "quote_requests": self.scheduler.requested,
+                "batched_fetches": self.scheduler.fetches,
+                "price_cache": game.price_cache.stats(),
+                "uptime": time.time() - self.started,
+            }
+        if len(parts) >= 2 and parts[0] == "players":
+            player_id = parts[1]
+            if not PLAYER_ID.match(player_id):
+                raise HttpError(400, "player id must be 1-64 letters, digits, '-' or '_'")
+            portfolio = self.registry.get(player_id)
+            if len(parts) == 2 and method == "GET":
+                return 200, await self.summary(portfolio)
+            if len(parts) == 3 and parts[2] in ("buy", "sell") and method == "POST":
+                return await self.trade(player_id, portfolio, parts[2], body)
+            if len(parts) == 3 and parts[2] == "batch" and method == "POST":
+                return await self.batch(player_id, portfolio, body)
+            if len(parts) == 3 and parts[2] == "orders" and method == "GET":
+                return 200, [order_json(order) for order in portfolio.open_orders.values()]
+            if len(parts) == 3 and parts[2] == "orders" and method == "POST":
+                return self.place_order(player_id, portfolio, body)
+            if len(parts) == 4 and parts[2] == "orders" and method == "DELETE":
+                order_id = int(parts[3]) if parts[3].isdigit() else None
+                if order_id not in portfolio.open_orders or not self.registry.book.cancel(order_id):
+                    raise HttpError(404, f"no open order {parts[3]}")
+                self.registry.dirty.add(player_id)
+                return 200, {"ok": True}
+            raise HttpError(405 if len(parts) <= 4 else 404, "unsupported player request")
+        raise HttpError(404, "not found")
+
+    async def summary(self, portfolio):
+        quotes = await self.scheduler.get(portfolio.stocks)
+        return {
+            "balance": portfolio.balance,
+            "net_worth": portfolio.get_net_worth(quotes),
+            "stocks": portfolio.stocks,
+            "quotes": quotes,
+            "positions": {ticker: position.to_dict() for ticker, position in portfolio.positions.items()},
+        }
+
+    async def trade(self, player_id, portfolio, action, body):
+        ticker = str(body.get("ticker", "")).strip().upper()
+        try:
+            shares = int(body.get("shares", 0))
+        except (TypeError, ValueError):
+            shares = 0
+        if not ticker or shares <= 0:
+            raise HttpError(400, "need a ticker and a positive number of shares")
+        price = (await self.scheduler.get([ticker])).get(ticker)
+        if price is None:
+            raise HttpError(404, f"no price available for {ticker}")
+        # Portfolio reports the outcome on stdout; hand that text back to the player
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            ok = getattr(portfolio, action)(ticker, shares, price)
+        if ok:
+            self.registry.dirty.add(player_id)
+        return (200 if ok else 409), {"ok": ok, "message": output.getvalue().strip(),
+                                      "price": price, "balance": portfolio.balance}
+
+    # {"orders": [{"action", "ticker", "shares"}, ...]} applied all or nothing at
+    # market prices; only the local --batch CLI may bring its own prices
+    async def batch(self, player_id, portfolio, body):
+        orders = body.get("orders")
+        if not isinstance(orders, list) or not all(isinstance(order, dict) for order in orders):
+            raise HttpError(400, "need a list of orders")
+        if any("price" in order for order in orders):
+            raise HttpError(400, "orders are priced from the market; leave out 'price'")
+        tickers = [str(order.get("ticker", "")).strip().upper() for order in orders]
+        quotes = await self.scheduler.get(tickers)
+        try:
+            trades = portfolio.execute_batch(orders, quotes)
+        except ValueError as e:
+            raise HttpError(409, str(e))
+        if trades:
+            self.registry.dirty.add(player_id)
+        return 200, {"ok": True, "trades": len(trades), "balance": portfolio.balance}
+
+    def place_order(self, player_id, portfolio, body):
+        try:
+            shares = int(body.get("shares", 0))
+            limit = None if body.get("limit") is None else float(body["limit"])
+            stop = None if body.get("stop") is None else float(body["stop"])
+            if shares <= 0:
+                raise ValueError("need a positive number of shares")
+            order = self.registry.book.submit(portfolio, str(body.get("ticker", "")).strip().upper(),
+                                              body.get("side"), body.get("type"), shares, limit, stop)
+        except (TypeError, ValueError) as e:
+            raise HttpError(400, str(e))
+        self.registry.dirty.add(player_id)
+        return 200, order_json(order)
+
+
+def order_json(order):
+    return {"id": order.id, "status": order.status, **order.to_dict()}
+
+
+async def serve(host, port, registry, scheduler):
+    server = GameServer(registry, scheduler)
+    listener = await asyncio.start_server(server.handle, host, port, limit=MAX_BODY)
+    saver = asyncio.create_task(registry.save_loop())
+    matcher = asyncio.create_task(registry.match_loop(scheduler))
+    print(f"Serving the Stock Trading Game on http://{host}:{port} (saves in {registry.directory}/)")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        saver.cancel()
+        matcher.cancel()
+        if registry.writing is not None:
+            registry.dirty.update(await registry.writing)
+        registry.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Stock Trading Game as a multi-player HTTP server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--save-format", choices=sorted(game.SAVE_FORMATS))
+    parser.add_argument("--provider", choices=sorted(game.PROVIDERS), default="yfinance")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.provider == "synthetic":
+        game.set_market_data(game.SyntheticProvider(args.seed, latency=args.latency))
+    elif args.provider == "replay":
+        game.set_market_data(game.ReplayProvider(latency=args.latency))
+    registry = PlayerRegistry(args.data_dir, args.save_format)
+    try:
+        asyncio.run(serve(args.host, args.port, registry, QuoteScheduler()))
+    except KeyboardInterrupt:
+        print("\nServer stopped; progress saved.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# Risk analytics for a Portfolio over the cached 2-year closes.
+#
+# Everything works on a days x tickers return matrix: rolling volatility from
+# cumulative sums, covariance/correlation from one matrix product, beta against
+# a benchmark ticker, and historical and Monte-Carlo value at risk. Monte-Carlo
+# paths are simulated in chunks of at most MC_CHUNK_ELEMENTS random draws so
+# memory stays flat however many paths are asked for.
+#
+#   python risk.py --benchmark SPY --confidence 0.99 --paths 50000
+#   python risk.py --provider synthetic --horizon 10
+import argparse
+import time
+
+import numpy as np
+
+import LiveFinanceGame as game
+
+BENCHMARK = "SPY"
+VOLATILITY_WINDOW = 21
+CONFIDENCE = 0.95
+MC_PATHS = 10_000
+MC_CHUNK_ELEMENTS = 2_000_000  # random draws per chunk (16 MB of float64)
+
+
+# Annualized volatility over a trailing window for every ticker; NaN until
+# `window` returns are available.
+def rolling_volatility(returns, window=VOLATILITY_WINDOW):
+    result = np.full(returns.shape, np.nan)
+    if window < 2 or window > len(returns):
+        return result
+    zero = np.zeros((1, returns.shape[1]))
+    sums = np.vstack([zero, np.cumsum(returns, axis=0)])
+    squares = np.vstack([zero, np.cumsum(returns * returns, axis=0)])
+    total = sums[window:] - sums[:-window]
+    total_sq = squares[window:] - squares[:-window]
+    variance = (total_sq - total * total / window) / (window - 1)
+    result[window - 1:] = np.sqrt(np.maximum(variance, 0) * game.TRADING_DAYS)
+    return result
+
+
+def covariance(returns):
+    centered = returns - returns.mean(axis=0)
+    return centered.T @ centered / max(len(returns) - 1, 1)
+
+
+def correlation(cov):
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(std, std)
+    corr[~np.isfinite(corr)] = 0.0
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+# Beta of every column of returns against the benchmark's returns
+def beta(returns, benchmark):
+    centered = benchmark - benchmark.mean()
+    variance = centered @ centered
+    if not variance:
+        return np.full(returns.shape[1], np.nan)
+    return centered @ (returns - returns.mean(axis=0)) / variance
+
+
+# Loss not exceeded with the given confidence, from a sample of P&L (positive = loss)
+def value_at_risk(pnl, confidence=CONFIDENCE):
+    return float(-np.percentile(pnl, (1 - confidence) * 100))
+
+
+def historical_var(returns, values, confidence=CONFIDENCE):
+    return value_at_risk(returns @ values, confidence)
+
+
+# Matrix F with F @ F.T equal to the covariance. Cholesky when the covariance
+# is full rank; with fewer days than tickers it never is, so the centered
+# returns themselves serve as the factor.
+def covariance_factor(returns):
+    if len(returns) > returns.shape[1]:
+        cov = covariance(returns)
+        try:
+            return np.linalg.cholesky(cov + np.eye(len(cov)) * 1e-12 * max(np.trace(cov), 1e-12))
+        except np.linalg.LinAlgError:
+            pass
+    centered = returns - returns.mean(axis=0)
+    return centered.T / np.sqrt(max(len(returns) - 1, 1))
+
+
+# Simulate `paths` horizon-day outcomes and take the VaR of the resulting P&L.
+# Daily log returns are modelled as correlated normals, so a horizon-day log
+# return is a single draw with horizon x the mean and variance and the cost
+# does not grow with the horizon.
+def monte_carlo_var(returns, values, confidence=CONFIDENCE, paths=MC_PATHS, horizon=1, seed=0):
+    logs = np.log1p(returns)
+    factor = covariance_factor(logs) * np.sqrt(horizon)
+    drift = logs.mean(axis=0) * horizon
+    rng = np.random.default_rng(seed)
+    chunk = max(1, MC_CHUNK_ELEMENTS // max(factor.shape))
+    pnl = np.empty(paths)
+    for start in range(0, paths, chunk):
+        n = min(chunk, paths - start)
+        draws = rng.standard_normal((n, factor.shape[1]))
+        pnl[start:start + n] = np.expm1(drift + draws @ factor.T) @ values
+    return value_at_risk(pnl, confidence)
+
+
+# Risk figures for the portfolio's current holdings, valued at the latest close
+@game.stats.timed("risk_report")
+def risk_report(portfolio, benchmark=BENCHMARK, window=VOLATILITY_WINDOW, confidence=CONFIDENCE,
+                paths=MC_PATHS, horizon=1, seed=0):
+    tickers = [ticker for ticker, shares in portfolio.stocks.items() if shares]
+    if not tickers:
+        return None
+    columns = list(dict.fromkeys(tickers + [benchmark]))
+    dates, closes = game.get_price_matrix(columns)
+    if len(dates) < 2:
+        return None
+    returns = game.daily_returns(closes)[1:]
+    held = returns[:, :len(tickers)]
+    latest = np.nan_to_num(closes[-1, :len(tickers)])
+    values = latest * np.array([portfolio.stocks[ticker] for ticker in tickers], dtype=float)
+    total = values.sum()
+    cov = covariance(held)
+    weights = values / total if total else values
+    betas = beta(held, returns[:, columns.index(benchmark)])
+    return {
+        "tickers": tickers,
+        "dates": dates,
+        "values": values,
+        "volatility": rolling_volatility(held, window)[-1],
+        "correlation": correlation(cov),
+        "beta": betas,
+        "portfolio_beta": float(weights @ betas),
+        "portfolio_volatility": float(np.sqrt(weights @ cov @ weights * game.TRADING_DAYS)),
+        "historical_var": historical_var(held, values, confidence),
+        "monte_carlo_var": monte_carlo_var(held, values, confidence, paths, horizon, seed),
+        "benchmark": benchmark,
+        "confidence": confidence,
+        "horizon": horizon,
+    }
+
+
+def show_risk_report(report, top=10):
+    if report is None:
+        print("No holdings with price history to analyze.")
+        return
+    level = f"{report['confidence'] * 100:.0f}%"
+    print(f"Holdings value: ${report['values'].sum():.2f} over {len(report['dates'])} days")
+    print(f"Annualized volatility: {report['portfolio_volatility'] * 100:.2f}% | "
+          f"Beta vs {report['benchmark']}: {report['portfolio_beta']:.2f}")
+    print(f"1-day historical VaR ({level}): ${report['historical_var']:.2f} | "
+          f"{report['horizon']}-day Monte-Carlo VaR ({level}): ${report['monte_carlo_var']:.2f}")
+    order = np.argsort(report["values"])[::-1][:top]
+    for i in order:
+        vol = report["volatility"][i]
+        vol_str = "N/A" if np.isnan(vol) else f"{vol * 100:.2f}%"
+        print(f"  {report['tickers'][i]:<6} ${report['values'][i]:>12.2f} | Vol: {vol_str:>8} | Beta: {report['beta'][i]:5.2f}")
+    if len(order) > 1:
+        corr = report["correlation"][np.ix_(order, order)]
+        pairs = np.triu_indices(len(order), 1)
+        strongest = np.argmax(corr[pairs])
+        a, b = order[pairs[0][strongest]], order[pairs[1][strongest]]
+        print(f"Most correlated holdings: {report['tickers'][a]} / {report['tickers'][b]} ({corr[pairs][strongest]:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Risk analytics for a saved portfolio")
+    parser.add_argument("--save-file", default="portfolio_save.json")
+    parser.add_argument("--benchmark", default=BENCHMARK)
+    parser.add_argument("--window", type=int, default=VOLATILITY_WINDOW, help="rolling volatility window in days")
+    parser.add_argument("--confidence", type=float, default=CONFIDENCE)
+    parser.add_argument("--paths", type=int, default=MC_PATHS, help="Monte-Carlo paths")
+    parser.add_argument("--horizon", type=int, default=1, help="Monte-Carlo horizon in trading days")
+    parser.add_argument("--provider", choices=sorted(game.PROVIDERS), default="yfinance")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.provider == "synthetic":
+        game.set_market_data(game.SyntheticProvider(args.seed))
+    elif args.provider == "replay":
+        game.set_market_data(game.ReplayProvider())
+
+    portfolio = game.Portfolio.load(args.save_file)
+    start = time.perf_counter()
+    report = risk_report(portfolio, args.benchmark, args.window, args.confidence, args.paths, args.horizon, args.seed)
+    show_risk_report(report)
+    print(f"Computed in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# Market screener over a configurable universe of tickers.
+#
+# Keeps one row of indicators per ticker (returns over PERFORMANCE_HORIZONS,
+# 50/200-day moving averages, 52-week high/low) in a structured array, plus a
+# sorted (value, ticker) index per column. update() only recomputes tickers
+# whose latest bar changed, moving their index entries with bisect; queries
+# like "top 20 by 1M return" walk an index and never fetch anything.
+#
+#   python screener.py --universe-file universe.txt --sort 1M --top 20
+#   python screener.py --provider synthetic --universe-size 5000 --sort 1Y --where 1M:0: --ascending
+import argparse
+import os
+import time
+from bisect import bisect_left, bisect_right, insort
+
+import numpy as np
+
+import LiveFinanceGame as game
+
+UNIVERSE_FILE = "universe.txt"  # one ticker per line; DEFAULT_STOCKS when missing
+SCREENER_FILE = os.path.join(game.HISTORY_DIR, "screener.npy")  # only for providers that persist history
+SCREEN_TTL = game.HISTORY_TTL  # seconds before a query refreshes the table first
+YEAR = 252
+
+COLUMNS = tuple(game.PERFORMANCE_HORIZONS) + ("close", "sma50", "sma200", "high52", "low52", "from_high")
+SCREEN_DTYPE = np.dtype([("ticker", "U16"), ("day", "i4")] + [(column, "f8") for column in COLUMNS])
+
+
+def load_universe(path=UNIVERSE_FILE):
+    if not os.path.exists(path):
+        return list(game.DEFAULT_STOCKS)
+    with open(path) as f:
+        return list(dict.fromkeys(line.strip().upper() for line in f if line.strip() and not line.startswith("#")))
+
+
+# Where the table is kept between runs: alongside the stored histories, and not
+# at all for replay/synthetic data, which would otherwise be read back as real
+def table_path():
+    return SCREENER_FILE if game.market_data.persist_history else None
+
+
+# Indicator rows for a batch of non-empty series, computed together
+def compute_indicators(tickers, series):
+    rows = np.zeros(len(series), dtype=SCREEN_DTYPE)
+    if not series:
+        return rows
+    rows["ticker"] = tickers
+    rows["day"] = [s.dates[-1].astype("i4") for s in series]
+    performance = game.compute_performance(series)
+    for n, column in enumerate(game.PERFORMANCE_HORIZONS):
+        rows[column] = performance[:, n]
+    # Last year of closes, right-aligned and NaN-padded, so every window is a column slice
+    tails = np.full((len(series), YEAR), np.nan)
+    for n, s in enumerate(series):
+        closes = s.closes[-YEAR:]
+        tails[n, YEAR - len(closes):] = closes
+    rows["close"] = tails[:, -1]
+    rows["sma50"] = tails[:, -50:].mean(axis=1)  # NaN until 50 bars
+    rows["sma200"] = tails[:, -200:].mean(axis=1)
+    rows["high52"] = np.nanmax(tails, axis=1)
+    rows["low52"] = np.nanmin(tails, axis=1)
+    rows["from_high"] = (rows["close"] / rows["high52"] - 1) * 100
+    return rows
+
+
+# (value, ticker) pairs kept sorted; NaN values are left out
+class SortedIndex:
+    def __init__(self, keys=()):
+        self.keys = sorted(key for key in keys if not np.isnan(key[0]))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, value, ticker):
+        if not np.isnan(value):
+            insort(self.keys, (value, ticker))
+
+    def remove(self, value, ticker):
+        if np.isnan(value):
+            return
+        i = bisect_left(self.keys, (value, ticker))
+        if i < len(self.keys) and self.keys[i] == (value, ticker):
+            del self.keys[i]
+
+    def ordered(self, ascending=True, low=None, high=None):
+        start = 0 if low is None else bisect_left(self.keys, (low,))
+        stop = len(self.keys) if high is None else bisect_right(self.keys, (high, "\uffff"))
+        keys = self.keys[start:stop]
+        return keys if ascending else reversed(keys)
+
+
+class Screener:
+    def __init__(self, universe, path=None):
+        self.universe = list(dict.fromkeys(universe))
+        self.path = path  # None keeps the table in memory only
+        self.table = np.zeros(0, dtype=SCREEN_DTYPE)
+        self.rows = {}  # ticker: row in table
+        self.missing = set()  # tickers whose last fetch had no history, so no row
+        self.indexes = {column: SortedIndex() for column in COLUMNS}
+        self.updated_at = 0.0
+
+    def __len__(self):
+        return len(self.rows)
+
+    @staticmethod
+    def load(universe, path=None):
+        screener = Screener(universe, table_path() if path is None else path)
+        if screener.path is not None and os.path.exists(screener.path):
+            table = np.load(screener.path)
+            if table.dtype == SCREEN_DTYPE:
+                screener.table = table.copy()
+                screener.rows = {ticker: n for n, ticker in enumerate(table["ticker"].tolist())}
+                tickers = table["ticker"].tolist()
+                screener.indexes = {column: SortedIndex(zip(table[column].tolist(), tickers)) for column in COLUMNS}
+                screener.updated_at = os.path.getmtime(screener.path)
+        return screener
+
+    def save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp.npy"
+        np.save(tmp, self.table[:len(self.rows)])
+        os.replace(tmp, self.path)
+
+    def row(self, ticker):
+        i = self.rows.get(ticker)
+        return None if i is None else self.table[i]
+
+    def _set(self, row):
+        ticker = str(row["ticker"])
+        i = self.rows.get(ticker)
+        if i is None:
+            i = self.rows[ticker] = len(self.rows)
+            if i == len(self.table):
+                grown = np.zeros(max(16, 2 * len(self.table)), dtype=SCREEN_DTYPE)
+                grown[:i] = self.table
+                self.table = grown
+        else:
+            old = self.table[i]
+            for column in COLUMNS:
+                self.indexes[column].remove(float(old[column]), ticker)
+        self.table[i] = row
+        for column in COLUMNS:
+            self.indexes[column].add(float(row[column]), ticker)
+
+    # Fetch histories (through the shared caches) and recompute only the tickers
+    # whose latest bar or close changed. Returns how many rows changed.
+    @game.stats.timed("Screener.update")
+    def update(self, tickers=None):
+        tickers = self.universe if tickers is None else list(dict.fromkeys(tickers))
+        histories = game.get_historical_prices_many(tickers)
+        changed = []
+        for ticker in tickers:
+            series = histories[ticker]
+            if not series:
+                self.missing.add(ticker)
+                continue
+            self.missing.discard(ticker)
+            old = self.row(ticker)
+            if old is None or old["day"] != series.dates[-1].astype("i4") or old["close"] != series.closes[-1]:
+                changed.append(ticker)
+        for row in compute_indicators(changed, [histories[ticker] for ticker in changed]):
+            self._set(row)
+        self.updated_at = time.time()
+        return len(changed)
+
+    def stale(self, ttl=SCREEN_TTL):
+        return time.time() - self.updated_at > ttl or \
+            any(ticker not in self.rows and ticker not in self.missing for ticker in self.universe)
+
+    # Rows ordered by `column`, best first unless ascending. `where` maps
+    # columns to (low, high) bounds, either of which may be None; a bound on
+    # the sort column narrows the index range by bisect. `match` is an extra
+    # test on the whole row.
+    def query(self, column, n=20, ascending=False, where=None, match=None):
+        if column not in self.indexes:
+            raise ValueError(f"Unknown column {column!r}; expected one of {COLUMNS}")
+        where = dict(where or {})
+        low, high = where.pop(column, (None, None))
+        universe = set(self.universe)
+        results = []
+        for _, ticker in self.indexes[column].ordered(ascending, low, high):
+            if ticker not in universe:
+                continue
+            row = self.table[self.rows[ticker]]
+            if all((lo is None or row[c] >= lo) and (hi is None or row[c] <= hi) for c, (lo, hi) in where.items()) \
+                    and (match is None or match(row)):
+                results.append(row)
+                if len(results) == n:
+                    break
+        return results
+
+
+# "1M:0:" -> ("1M", (0.0, None)); "from_high::-20" -> ("from_high", (None, -20.0))
+def parse_bound(text):
+    column, _, bounds = text.partition(":")
+    low, _, high = bounds.partition(":")
+    return column, (float(low) if low else None, float(high) if high else None)
+
+
+def format_row(row):
+    labels = " | ".join(
+        f"{column}: N/A" if np.isnan(row[column]) else f"{column}: {row[column]:.2f}%"
+        for column in game.PERFORMANCE_HORIZONS
+    )
+    sma = " ".join(f"{label}: {'N/A' if np.isnan(row[label]) else f'${row[label]:.2f}'}" for label in ("sma50", "sma200"))
+    return (f"{row['ticker']:<6} ${row['close']:>9.2f} | {labels} | {sma} | "
+            f"52w: ${row['low52']:.2f}-${row['high52']:.2f} ({row['from_high']:.1f}% from high)")
+
+
+def show_screen(results, column):
+    if not results:
+        print("No tickers match.")
+        return
+    print(f"\n--- Screen by {column} ---")
+    for row in results:
+        print(format_row(row))
+    print("-" * 20 + "\n")
+
+
+# Interactive screen for the game's market menu; refreshes the table when stale
+def run_screen(screener):
+    if screener.stale():
+        print(f"Updating indicators for {len(screener.universe)} tickers...")
+        screener.update()
+        screener.save()
+    column = input(f"Sort by ({', '.join(COLUMNS)}) [1M]: ").strip() or "1M"
+    if column not in COLUMNS:
+        print("Unknown column.")
+        return
+    count = input("How many [20]: ").strip()
+    ascending = input("Lowest first? (yes/no): ").strip().lower() == "yes"
+    above = input("Only tickers above their 200-day average? (yes/no): ").strip().lower() == "yes"
+    match = (lambda row: row["close"] > row["sma200"]) if above else None
+    show_screen(screener.query(column, int(count) if count.isdigit() else 20, ascending, match=match), column)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen a ticker universe by precomputed indicators")
+    parser.add_argument("--universe-file", default=UNIVERSE_FILE)
+    parser.add_argument("--universe-size", type=int, help="screen T00000..Tn synthetic tickers instead of a file")
+    parser.add_argument("--sort", default="1M", choices=COLUMNS)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--ascending", action="store_true")
+    parser.add_argument("--where", nargs="*", default=[], metavar="COLUMN:LOW:HIGH", help="bounds such as 1Y:0: or from_high::-20")
+    parser.add_argument("--table", help=f"where the indicator table is kept (default {SCREENER_FILE}, yfinance only)")
+    parser.add_argument("--provider", choices=sorted(game.PROVIDERS), default="yfinance")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.provider == "synthetic":
+        game.set_market_data(game.SyntheticProvider(args.seed))
+    elif args.provider == "replay":
+        game.set_market_data(game.ReplayProvider())
+    if args.universe_size:
+        universe = [f"T{n:05d}" for n in range(args.universe_size)]
+    else:
+        universe = load_universe(args.universe_file)
+
+    screener = Screener.load(universe, args.table)
+    start = time.perf_counter()
+    changed = screener.update()
+    screener.save()
+    updated = time.perf_counter() - start
+    start = time.perf_counter()
+    results = screener.query(args.sort, args.top, args.ascending, dict(parse_bound(bound) for bound in args.where))
+    queried = time.perf_counter() - start
+    show_screen(results, args.sort)
+    print(f"{changed} of {len(universe)} rows recomputed in {updated:.2f}s; query took {queried * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()